@@ -1,38 +1,46 @@
+import asyncio
 from pathlib import Path
 
-from proportional_ec.data import (
-    load_candidate_totals_and_parties,
-    load_electoral_college_per_year,
-)
-from proportional_ec.draw import draw_ec_map
-from proportional_ec.election import run_election
+from proportional_ec.data import load_electoral_college_per_year, load_votes
 from proportional_ec.election_method import run_droop_quota_largest_remainder
+from proportional_ec.pipeline import (
+    ElectionJob,
+    election_stages,
+    format_stage_stats,
+    run_pipeline,
+)
 from proportional_ec.summarise import aggregate_election_results
 
+
+def print_results(job: ElectionJob) -> None:
+    print(job.year, aggregate_election_results(job.state_seats))
+
+
 if __name__ == "__main__":
     year_ec_votes = load_electoral_college_per_year(
         Path("data/electoral_college/electoral_college.csv"),
     )
-    year_candidate_totals, year_candidate_party = load_candidate_totals_and_parties(
+    year_candidate_totals, index = load_votes(
         Path("data/state_votes/1976-2020-president.csv"),
     )
 
-    for year in year_candidate_totals:
-        election_results = run_election(
-            run_droop_quota_largest_remainder,
+    jobs = (
+        ElectionJob(
+            year,
+            Path(f"data/topo_data/tiles{year}.topo.json"),
+            Path(f"images/{year}_election.png"),
             year_candidate_totals[year],
             year_ec_votes[year],
+            index.labels(year),
         )
-        overall_results = aggregate_election_results(election_results)
-
-        print(year, overall_results)
+        for year in year_candidate_totals
+    )
 
-        topo_file = Path(f"data/topo_data/tiles{year}.topo.json")
-        fig_out_path = Path(f"images/{year}_election.png")
-        draw_ec_map(
-            fig_out_path,
-            topo_file,
-            year,
-            election_results,
-            year_candidate_party[year],
-        )
+    stats = asyncio.run(
+        run_pipeline(
+            jobs,
+            election_stages(run_droop_quota_largest_remainder, processes=2),
+            sink=print_results,
+        ),
+    )
+    print(format_stage_stats(stats))
@@ -1,14 +1,40 @@
-from proportional_ec.draw import (
-    draw_ec_map,
-    generate_polygons_centroids_and_lines,
-    load_topo_data,
-)
-from proportional_ec.ec_data import download_dataset
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from proportional_ec.draw import (
+        draw_ec_map,
+        generate_polygons_centroids_and_lines,
+        load_hex_topology,
+        load_topo_data,
+    )
+    from proportional_ec.ec_data import download_dataset
+    from proportional_ec.web_map import export_web_map
 
 __version__ = "0.1"
 __all__ = [
     "download_dataset",
     "load_topo_data",
+    "load_hex_topology",
     "generate_polygons_centroids_and_lines",
     "draw_ec_map",
+    "export_web_map",
 ]
+
+# Plotting and web libraries are slow to import, so the exports are loaded
+# on first use and computing results alone stays fast.
+_EXPORT_MODULES = {
+    "download_dataset": "proportional_ec.ec_data",
+    "load_topo_data": "proportional_ec.draw",
+    "load_hex_topology": "proportional_ec.draw",
+    "generate_polygons_centroids_and_lines": "proportional_ec.draw",
+    "draw_ec_map": "proportional_ec.draw",
+    "export_web_map": "proportional_ec.web_map",
+}
+
+
+def __getattr__(name: str) -> object:
+    if name not in _EXPORT_MODULES:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    return getattr(import_module(_EXPORT_MODULES[name]), name)
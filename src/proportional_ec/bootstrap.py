@@ -0,0 +1,276 @@
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import numpy.typing as npt
+
+from proportional_ec.election_method import (
+    TieBreaker,
+    TieKind,
+    TiePolicy,
+    batched_largest_remainder,
+    droop_quota_seats,
+    largest_remainder_outcomes,
+    policy_tie_order,
+)
+from proportional_ec.typing import Candidate, Seats, StatePo, Vote
+
+# Maps available seats to the number of seats the quota divides votes by
+QuotaSeats = Callable[[npt.NDArray[np.int64]], npt.NDArray[np.int64]]
+
+# Replicates are drawn in blocks of this size, each from its own spawned
+# seed, so results only depend on the seed and never on the worker count.
+BLOCK_SIZE = 256
+
+
+@dataclass
+class BootstrapResult:
+    candidates: list[Candidate]
+    # EVs of each candidate with the reported votes
+    ec_votes: npt.NDArray[np.int64]
+    # EVs of each candidate in every replicate, (replicates, candidates)
+    replicates: npt.NDArray[np.int64]
+    confidence: float
+    lower: npt.NDArray[np.int64]
+    upper: npt.NDArray[np.int64]
+    winner: Candidate
+    # Share of replicates where the winner does not have the most EVs alone
+    winner_change_probability: float
+    # Replicates left out under the "error" tie policy because a state's
+    # apportionment was tied or over allocated
+    undefined: int = 0
+    # States settled by the tie policy in all replicates, by kind of tie
+    ties: Counter[TieKind] = field(default_factory=Counter)
+
+    def intervals(self) -> dict[Candidate, tuple[Seats, Seats]]:
+        # Only candidates winning an EV in some replicate
+        return {
+            candidate: (lower, upper)
+            for candidate, lower, upper in zip(
+                self.candidates,
+                self.lower.tolist(),
+                self.upper.tolist(),
+                strict=True,
+            )
+            if upper > 0
+        }
+
+    def __str__(self) -> str:
+        lines = [
+            (
+                f"{len(self.replicates)} replicates ({self.undefined} undefined), "
+                f"{self.confidence:.0%} intervals, "
+                f"P(winner changes) = {self.winner_change_probability:.4f}"
+            ),
+        ]
+        if self.ties:
+            lines.append(
+                "Ties broken: "
+                + ", ".join(f"{kind}: {count}" for kind, count in self.ties.items()),
+            )
+        ec_votes = dict(zip(self.candidates, self.ec_votes.tolist(), strict=True))
+        lines.extend(
+            f"{candidate}: {ec_votes[candidate]} [{lower}, {upper}]"
+            for candidate, (lower, upper) in self.intervals().items()
+        )
+        return "\n".join(lines)
+
+
+def _vote_matrix(
+    state_candidate_counts: dict[StatePo, dict[Candidate, Vote]],
+    state_ec_votes: dict[StatePo, Seats],
+) -> tuple[list[Candidate], npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    candidates = list(
+        dict.fromkeys(
+            candidate
+            for candidate_votes in state_candidate_counts.values()
+            for candidate in candidate_votes
+        ),
+    )
+    column = {candidate: i for i, candidate in enumerate(candidates)}
+    votes = np.zeros((len(state_candidate_counts), len(candidates)), dtype=np.int64)
+    for i, candidate_votes in enumerate(state_candidate_counts.values()):
+        for candidate, count in candidate_votes.items():
+            votes[i, column[candidate]] = count
+    seats = np.array(
+        [state_ec_votes[state] for state in state_candidate_counts],
+        dtype=np.int64,
+    )
+    return candidates, votes, seats
+
+
+@dataclass
+class _BlockInputs:
+    votes: npt.NDArray[np.int64]
+    seats: npt.NDArray[np.int64]
+    quota_seats: QuotaSeats
+    tie_policy: TiePolicy
+
+
+def _run_block(
+    inputs: _BlockInputs,
+    seed: np.random.SeedSequence,
+    size: int,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.bool_], Counter[TieKind]]:
+    # Every state is resampled as a multinomial over its candidates with
+    # the reported turnout, then apportioned in one batched call. Ties are
+    # settled per state, or make the replicate undefined under "error".
+    totals = inputs.votes.sum(axis=1)
+    shares = inputs.votes / np.maximum(totals, 1)[:, None]
+    rng = np.random.default_rng(seed)
+    resampled = rng.multinomial(totals, shares, size=(size, len(totals)))
+    state_seats, over_allocated, tied = largest_remainder_outcomes(
+        resampled,
+        inputs.seats,
+        inputs.quota_seats(inputs.seats),
+        policy_tie_order(inputs.tie_policy, resampled, rng),
+    )
+    undefined = (over_allocated | tied).any(axis=1)
+    if inputs.tie_policy == "error":
+        return state_seats.sum(axis=1), undefined, Counter()
+    ties = Counter(
+        over_allocation=int(over_allocated.sum()),
+        remainder=int(tied.sum()),
+    )
+    return state_seats.sum(axis=1), np.zeros_like(undefined), +ties
+
+
+# Views of the shared input arrays in each worker process, and the shared
+# memory they map
+_worker_inputs = {}
+
+
+def _attach_inputs(
+    votes_name: str,
+    votes_shape: tuple[int, int],
+    seats_name: str,
+    quota_seats: QuotaSeats,
+    tie_policy: TiePolicy,
+) -> None:
+    votes_memory = SharedMemory(votes_name)
+    seats_memory = SharedMemory(seats_name)
+    _worker_inputs.update(
+        memory=(votes_memory, seats_memory),
+        inputs=_BlockInputs(
+            np.ndarray(votes_shape, dtype=np.int64, buffer=votes_memory.buf),
+            np.ndarray(votes_shape[:1], dtype=np.int64, buffer=seats_memory.buf),
+            quota_seats,
+            tie_policy,
+        ),
+    )
+
+
+def _run_shared_block(
+    seed: np.random.SeedSequence,
+    size: int,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.bool_], Counter[TieKind]]:
+    return _run_block(_worker_inputs["inputs"], seed, size)
+
+
+def _shared_copy(array: npt.NDArray[np.int64]) -> SharedMemory:
+    memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[:] = array
+    return memory
+
+
+def bootstrap_election(  # noqa: PLR0913, options are keyword only
+    state_candidate_counts: dict[StatePo, dict[Candidate, Vote]],
+    state_ec_votes: dict[StatePo, Seats],
+    *,
+    replicates: int = 1000,
+    seed: int | None = 0,
+    confidence: float = 0.95,
+    processes: int = 1,
+    quota_seats: QuotaSeats = droop_quota_seats,
+    tie_policy: TiePolicy = "error",
+) -> BootstrapResult:
+    if replicates < 1:
+        msg = "At least one replicate is needed."
+        raise ValueError(msg)
+    if not 0 < confidence < 1:
+        msg = "The confidence level must be between 0 and 1."
+        raise ValueError(msg)
+    if tie_policy not in ("error", "votes", "lot"):
+        msg = f"Tie policy {tie_policy!r} cannot be used when bootstrapping."
+        raise ValueError(msg)
+
+    candidates, votes, seats = _vote_matrix(state_candidate_counts, state_ec_votes)
+    ec_votes = batched_largest_remainder(
+        votes,
+        seats,
+        quota_seats(seats),
+        None if tie_policy == "error" else TieBreaker(tie_policy, seed),
+    ).sum(axis=0)
+
+    sizes = [BLOCK_SIZE] * (replicates // BLOCK_SIZE)
+    if replicates % BLOCK_SIZE:
+        sizes.append(replicates % BLOCK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if processes > 1 and len(sizes) > 1:
+        # Workers map the vote data from shared memory, tasks only carry
+        # their seed and block size.
+        votes_memory = _shared_copy(votes)
+        seats_memory = _shared_copy(seats)
+        try:
+            with ProcessPoolExecutor(
+                min(processes, len(sizes)),
+                initializer=_attach_inputs,
+                initargs=(
+                    votes_memory.name,
+                    votes.shape,
+                    seats_memory.name,
+                    quota_seats,
+                    tie_policy,
+                ),
+            ) as executor:
+                blocks = list(executor.map(_run_shared_block, seeds, sizes))
+        finally:
+            for memory in (votes_memory, seats_memory):
+                memory.close()
+                memory.unlink()
+    else:
+        inputs = _BlockInputs(votes, seats, quota_seats, tie_policy)
+        blocks = [
+            _run_block(inputs, block_seed, size)
+            for block_seed, size in zip(seeds, sizes, strict=True)
+        ]
+    undefined = np.concatenate([block_undefined for _, block_undefined, _ in blocks])
+    replicate_ec_votes = np.concatenate([block for block, _, _ in blocks])[~undefined]
+    ties = sum((block_ties for _, _, block_ties in blocks), Counter())
+    if len(replicate_ec_votes) == 0:
+        msg = "Every replicate had a tied or over allocated state."
+        raise RuntimeError(msg)
+
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(
+        replicate_ec_votes,
+        [alpha, 1 - alpha],
+        axis=0,
+        method="inverted_cdf",
+    ).astype(np.int64)
+
+    winner = int(np.argmax(ec_votes))
+    runner_up = np.delete(replicate_ec_votes, winner, axis=1).max(
+        axis=1,
+        initial=0,
+    )
+    winner_change_probability = float(
+        np.mean(replicate_ec_votes[:, winner] <= runner_up),
+    )
+
+    return BootstrapResult(
+        candidates,
+        ec_votes,
+        replicate_ec_votes,
+        confidence,
+        lower,
+        upper,
+        candidates[winner],
+        winner_change_probability,
+        int(undefined.sum()),
+        ties,
+    )
@@ -0,0 +1,522 @@
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from collections import Counter
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from proportional_ec.bootstrap import BootstrapResult, bootstrap_election
+from proportional_ec.data import load_electoral_college_per_year, load_votes
+from proportional_ec.election_method import (
+    TIE_MESSAGES,
+    TieBreaker,
+    TieKind,
+    droop_quota_seats,
+    hare_quota_seats,
+    run_droop_quota_largest_remainder,
+    run_hare_quota_largest_remainder,
+)
+from proportional_ec.identity import CandidateLabel
+from proportional_ec.store import (
+    ElectionMethod,
+    ResultStore,
+    election_input_hash,
+    method_name,
+    run_election_counting_ties,
+)
+from proportional_ec.summarise import aggregate_election_results
+from proportional_ec.typing import Candidate, Seats, StatePo, Vote, Year
+from proportional_ec.validate import ValidationMode
+
+if TYPE_CHECKING:
+    from proportional_ec.pipeline import StageStats
+
+ELECTION_METHODS = {
+    "droop": run_droop_quota_largest_remainder,
+    "hare": run_hare_quota_largest_remainder,
+}
+QUOTA_SEATS = {
+    "droop": droop_quota_seats,
+    "hare": hare_quota_seats,
+}
+# Enumerating every tied outcome only makes sense one election at a time
+TIE_POLICIES = ("error", "votes", "lot")
+RENDER_FORMATS = ("png", "html")
+RESULT_FORMATS = ("json", "csv")
+BASELINE_SCENARIO = "baseline"
+
+Bootstrap = Callable[
+    [dict[StatePo, dict[Candidate, Vote]], dict[StatePo, Seats]],
+    BootstrapResult,
+]
+
+
+@dataclass
+class ScenarioJob:
+    scenario: str
+    year: Year
+    state_candidate_counts: dict[StatePo, dict[Candidate, Vote]]
+    state_ec_votes: dict[StatePo, Seats]
+    candidate_labels: dict[Candidate, CandidateLabel]
+    state_seats: dict[StatePo, dict[Candidate, Seats]] | None = None
+    bootstrap: BootstrapResult | None = None
+
+
+def parse_year_range(value: str) -> tuple[Year, Year]:
+    start, _, end = value.partition("-")
+    try:
+        return int(start), int(end or start)
+    except ValueError:
+        msg = f"Invalid year or year range: {value!r}"
+        raise argparse.ArgumentTypeError(msg) from None
+
+
+def select_years(
+    available: Sequence[Year],
+    year_ranges: Sequence[tuple[Year, Year]] | None,
+) -> list[Year]:
+    if year_ranges is None:
+        return list(available)
+
+    for first, last in year_ranges:
+        if not any(first <= year <= last for year in available):
+            msg = f"No elections between {first} and {last}."
+            raise ValueError(msg)
+    return [
+        year
+        for year in available
+        if any(first <= year <= last for first, last in year_ranges)
+    ]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="proportional-ec",
+        description="What if the electoral college was proportional?",
+    )
+    parser.add_argument(
+        "-y",
+        "--years",
+        nargs="+",
+        type=parse_year_range,
+        metavar="YEAR",
+        help="Election years or ranges such as 1976-2000 (default: all).",
+    )
+    parser.add_argument(
+        "-m",
+        "--method",
+        choices=ELECTION_METHODS,
+        default="droop",
+        help="Apportionment method within each state (default: droop).",
+    )
+    parser.add_argument(
+        "-s",
+        "--scenario",
+        action="append",
+        type=Path,
+        metavar="FILE",
+        help="State votes file in the MIT Election Lab format, may be repeated "
+        "(default: the 1976-2020 returns).",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        nargs="+",
+        choices=RENDER_FORMATS + RESULT_FORMATS,
+        dest="formats",
+        help="Outputs to write (default: png, or json with --compute-only).",
+    )
+    parser.add_argument(
+        "-c",
+        "--compute-only",
+        action="store_true",
+        help="Only compute results, never render maps.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes (default: 1).",
+    )
+    parser.add_argument(
+        "-b",
+        "--bootstrap",
+        type=int,
+        metavar="REPLICATES",
+        help="Resample state votes to give confidence intervals on EV totals.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for --bootstrap and tie lots, results do not depend on --jobs "
+        "(default: 0).",
+    )
+    parser.add_argument(
+        "-t",
+        "--tie-policy",
+        choices=TIE_POLICIES,
+        default="error",
+        help="Stop on tied seats (error), favour the most votes (votes) or draw "
+        "lots (lot) (default: error).",
+    )
+    parser.add_argument(
+        "--lenient",
+        action="store_true",
+        help="Skip rows failing validation with a warning instead of stopping.",
+    )
+    parser.add_argument("--data-dir", type=Path, default=Path("data"))
+    parser.add_argument("-o", "--out-dir", type=Path, default=Path("images"))
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        metavar="PATH",
+        help="SQLite file to memoise results in between runs.",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true")
+    return parser
+
+
+def load_jobs(
+    data_dir: Path,
+    scenario_paths: Sequence[Path] | None,
+    year_ranges: Sequence[tuple[Year, Year]] | None,
+    mode: ValidationMode = "strict",
+) -> list[ScenarioJob]:
+    year_ec_votes = load_electoral_college_per_year(
+        data_dir / "electoral_college" / "electoral_college.csv",
+    )
+    scenarios = {}
+    if not scenario_paths:
+        scenarios[BASELINE_SCENARIO] = (
+            data_dir / "state_votes" / "1976-2020-president.csv"
+        )
+    else:
+        # Outputs are named after the scenario, so names must be unique
+        for path in scenario_paths:
+            if path.stem in scenarios:
+                msg = (
+                    f"Scenarios {scenarios[path.stem]} and {path} are both "
+                    f"named {path.stem!r}."
+                )
+                raise ValueError(msg)
+            scenarios[path.stem] = path
+
+    jobs = []
+    for scenario, path in scenarios.items():
+        year_candidate_totals, index = load_votes(
+            path,
+            mode=mode,
+            year_ec_votes=year_ec_votes,
+        )
+        jobs.extend(
+            ScenarioJob(
+                scenario,
+                year,
+                year_candidate_totals[year],
+                year_ec_votes[year],
+                index.labels(year),
+            )
+            for year in select_years(list(year_candidate_totals), year_ranges)
+        )
+    return jobs
+
+
+def compute_results(
+    jobs: Sequence[ScenarioJob],
+    election_method: ElectionMethod,
+    n_jobs: int = 1,
+    store: ResultStore | None = None,
+) -> Counter[TieKind]:
+    input_hashes = {}
+    job_ties = {}
+    pending = []
+    for job in jobs:
+        if store is not None:
+            input_hashes[id(job)] = election_input_hash(
+                election_method,
+                job.state_candidate_counts,
+                job.state_ec_votes,
+            )
+            job.state_seats = store.get(input_hashes[id(job)])
+        if job.state_seats is None:
+            pending.append(job)
+        elif store is not None:
+            # Counted again, so a warm store reports the same ties
+            job_ties[id(job)] = store.ties(input_hashes[id(job)])
+
+    counts = [job.state_candidate_counts for job in pending]
+    ec_votes = [job.state_ec_votes for job in pending]
+    run = partial(run_election_counting_ties, election_method)
+    if n_jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(min(n_jobs, len(pending))) as executor:
+            results = list(executor.map(run, counts, ec_votes))
+    else:
+        results = list(map(run, counts, ec_votes))
+    for job, (state_seats, ties) in zip(pending, results, strict=True):
+        job.state_seats = state_seats
+        job_ties[id(job)] = ties
+
+    if store is not None:
+        for job in jobs:
+            store.put(
+                input_hashes[id(job)],
+                job.state_seats,
+                year=job.year,
+                method=method_name(election_method),
+                scenario=job.scenario,
+                ties=job_ties[id(job)],
+            )
+    return sum(job_ties.values(), Counter())
+
+
+def compute_bootstraps(
+    jobs: Sequence[ScenarioJob],
+    bootstrap: Bootstrap = bootstrap_election,
+) -> None:
+    # bootstrap is bootstrap_election with the options of the run bound
+    for job in jobs:
+        job.bootstrap = bootstrap(job.state_candidate_counts, job.state_ec_votes)
+
+
+def _bootstrap_record(result: BootstrapResult) -> dict[str, object]:
+    return {
+        "replicates": len(result.replicates),
+        "undefined": result.undefined,
+        "confidence": result.confidence,
+        "intervals": result.intervals(),
+        "winner": result.winner,
+        "winner_change_probability": result.winner_change_probability,
+    }
+
+
+def _result_records(
+    jobs: Sequence[ScenarioJob],
+    method: str,
+) -> list[dict[str, object]]:
+    records = []
+    for job in jobs:
+        record = {
+            "scenario": job.scenario,
+            "year": job.year,
+            "method": method,
+            "totals": aggregate_election_results(job.state_seats),
+            "states": job.state_seats,
+        }
+        if job.bootstrap is not None:
+            record["bootstrap"] = _bootstrap_record(job.bootstrap)
+        records.append(record)
+    return records
+
+
+def write_json(path: Path, jobs: Sequence[ScenarioJob], method: str) -> None:
+    with path.open("w") as f:
+        json.dump(_result_records(jobs, method), f, indent=1)
+
+
+def write_csv(path: Path, jobs: Sequence[ScenarioJob], method: str) -> None:
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["scenario", "year", "method", "state", "candidate", "party", "seats"],
+        )
+        for job in jobs:
+            for state, candidate_seats in job.state_seats.items():
+                for candidate, seats in candidate_seats.items():
+                    writer.writerow(
+                        [
+                            job.scenario,
+                            job.year,
+                            method,
+                            state,
+                            candidate,
+                            job.candidate_labels[candidate].party,
+                            seats,
+                        ],
+                    )
+
+
+def _png_path(out_dir: Path, job: ScenarioJob) -> Path:
+    if job.scenario == BASELINE_SCENARIO:
+        return out_dir / f"{job.year}_election.png"
+    return out_dir / f"{job.scenario}_{job.year}_election.png"
+
+
+def write_png(
+    out_dir: Path,
+    data_dir: Path,
+    jobs: Sequence[ScenarioJob],
+    election_method: ElectionMethod,
+    n_jobs: int,
+) -> list["StageStats"]:
+    # Plotting libraries are only imported when something is drawn
+    from proportional_ec.pipeline import (  # noqa: PLC0415
+        ElectionJob,
+        election_stages,
+        run_pipeline,
+    )
+
+    election_jobs = (
+        ElectionJob(
+            job.year,
+            data_dir / "topo_data" / f"tiles{job.year}.topo.json",
+            _png_path(out_dir, job),
+            job.state_candidate_counts,
+            job.state_ec_votes,
+            job.candidate_labels,
+            state_seats=job.state_seats,
+        )
+        for job in jobs
+    )
+    return asyncio.run(
+        run_pipeline(
+            election_jobs,
+            election_stages(election_method, processes=n_jobs if n_jobs > 1 else 0),
+        ),
+    )
+
+
+def write_html(out_dir: Path, data_dir: Path, jobs: Sequence[ScenarioJob]) -> None:
+    from proportional_ec.draw import load_hex_topology  # noqa: PLC0415
+    from proportional_ec.web_map import export_web_map  # noqa: PLC0415
+
+    year_topology = {
+        year: load_hex_topology(data_dir / "topo_data" / f"tiles{year}.topo.json")
+        for year in {job.year for job in jobs}
+    }
+    for scenario in dict.fromkeys(job.scenario for job in jobs):
+        scenario_jobs = [job for job in jobs if job.scenario == scenario]
+        export_web_map(
+            out_dir / f"{scenario}_election_map.html",
+            year_topology,
+            {job.year: job.state_seats for job in scenario_jobs},
+            {job.year: job.candidate_labels for job in scenario_jobs},
+        )
+
+
+def _output_formats(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+) -> list[str]:
+    formats = args.formats or (["json"] if args.compute_only else ["png"])
+    if args.compute_only and set(formats) & set(RENDER_FORMATS):
+        parser.error("--compute-only cannot be combined with png or html output.")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1.")
+    if args.bootstrap is not None and args.bootstrap < 1:
+        parser.error("--bootstrap needs at least 1 replicate.")
+    return formats
+
+
+def _election_method(args: argparse.Namespace) -> ElectionMethod:
+    election_method = ELECTION_METHODS[args.method]
+    if args.tie_policy == "error":
+        return election_method
+    # Part of the method name, so results are stored by tie policy
+    return partial(
+        election_method,
+        tie_breaker=TieBreaker(args.tie_policy, args.seed),
+    )
+
+
+def _compute(
+    args: argparse.Namespace,
+    jobs: Sequence[ScenarioJob],
+    election_method: ElectionMethod,
+) -> None:
+    if args.cache is None:
+        ties = compute_results(jobs, election_method, args.jobs)
+    else:
+        with ResultStore(args.cache) as store:
+            ties = compute_results(jobs, election_method, args.jobs, store)
+            if not args.quiet:
+                sys.stderr.write(f"{store.stats()}\n")
+    if ties and not args.quiet:
+        sys.stderr.write(
+            f"Ties broken by {args.tie_policy}: "
+            + ", ".join(f"{kind}: {count}" for kind, count in ties.items())
+            + "\n",
+        )
+
+    if args.bootstrap is not None:
+        compute_bootstraps(
+            jobs,
+            partial(
+                bootstrap_election,
+                replicates=args.bootstrap,
+                seed=args.seed,
+                processes=args.jobs,
+                quota_seats=QUOTA_SEATS[args.method],
+                tie_policy=args.tie_policy,
+            ),
+        )
+
+    if not args.quiet:
+        for job in jobs:
+            overall_results = aggregate_election_results(job.state_seats)
+            sys.stdout.write(f"{job.scenario} {job.year} {overall_results}\n")
+            if job.bootstrap is not None:
+                sys.stdout.write(f"{job.bootstrap}\n")
+
+
+def _write_outputs(
+    args: argparse.Namespace,
+    formats: Sequence[str],
+    jobs: Sequence[ScenarioJob],
+    election_method: ElectionMethod,
+) -> None:
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    method = method_name(election_method)
+    if "json" in formats:
+        write_json(args.out_dir / "results.json", jobs, method)
+    if "csv" in formats:
+        write_csv(args.out_dir / "results.csv", jobs, method)
+    if "html" in formats:
+        write_html(args.out_dir, args.data_dir, jobs)
+    if "png" in formats:
+        stats = write_png(
+            args.out_dir,
+            args.data_dir,
+            jobs,
+            election_method,
+            args.jobs,
+        )
+        if not args.quiet:
+            sys.stderr.writelines(f"{stage_stats}\n" for stage_stats in stats)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    formats = _output_formats(parser, args)
+
+    try:
+        jobs = load_jobs(
+            args.data_dir,
+            args.scenario,
+            args.years,
+            "lenient" if args.lenient else "strict",
+        )
+        election_method = _election_method(args)
+        _compute(args, jobs, election_method)
+        _write_outputs(args, formats, jobs, election_method)
+    except RuntimeError as e:
+        if str(e) in TIE_MESSAGES.values():
+            parser.error(f"{e} See --tie-policy.")
+        parser.error(str(e))
+    except KeyError as e:
+        parser.error(f"Missing data: {e.args[0]}")
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
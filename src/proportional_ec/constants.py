@@ -61,3 +61,11 @@ PARTY_COLOUR = {
     "GREEN": "forestgreen",
     "NO PARTY AFFILIATION": "grey",
 }
+
+# Spellings of the same candidate which no normalisation rule can match,
+# as candidate_key forms
+CANDIDATE_ALIASES = {
+    "DANIELS, RON": "DANIELS, RONALD",
+    "HEDGES, JIM": "HEDGES, JAMES",
+    "STEVENS, THOMAS R.": 'STEVENS, THOMAS ROBERT "TOM"',
+}
@@ -1,8 +1,9 @@
-import csv
 from pathlib import Path
 
 from proportional_ec.constants import STATE_PO
+from proportional_ec.identity import CandidateIndex, build_candidate_index
 from proportional_ec.typing import Candidate, Party, StatePo, Vote, Year
+from proportional_ec.validate import ValidationMode, read_votes_table, validate_votes
 
 
 def load_electoral_college_per_year(path: Path) -> dict[Year, dict[StatePo, Vote]]:
@@ -21,104 +22,80 @@ def load_electoral_college_per_year(path: Path) -> dict[Year, dict[StatePo, Vote
     return year_state_ev
 
 
+def load_votes(
+    path: Path,
+    *,
+    mode: ValidationMode = "strict",
+    year_ec_votes: dict[Year, dict[StatePo, Vote]] | None = None,
+) -> tuple[dict[Year, dict[StatePo, dict[Candidate, Vote]]], CandidateIndex]:
+    table = read_votes_table(path)
+    # Raises with every problem found in strict mode, lenient mode warns
+    # and skips the rows which cannot be loaded.
+    report = validate_votes(table, year_ec_votes)
+    report.enforce(mode)
+    usable = ~report.unusable
+
+    years = table.numeric("year")[0][usable]
+    candidate_votes = table.numeric("candidatevotes")[0][usable]
+    index, candidate_ids = build_candidate_index(
+        years,
+        table.candidates()[usable],
+        table.columns["party_detailed"][usable],
+        candidate_votes,
+    )
+
+    # Every spelling of a candidate is counted under its canonical name
+    year_state_cand_votes = {}
+    for year, po, candidate, votes in zip(
+        years.tolist(),
+        table.columns["state_po"][usable].tolist(),
+        map(index.names.__getitem__, candidate_ids.tolist()),
+        candidate_votes.tolist(),
+        strict=True,
+    ):
+        if year not in year_state_cand_votes:
+            year_state_cand_votes[year] = {}
+
+        if po not in year_state_cand_votes[year]:
+            year_state_cand_votes[year][po] = {}
+
+        if candidate not in year_state_cand_votes[year][po]:
+            year_state_cand_votes[year][po][candidate] = votes
+        else:
+            # Some entries include candidates running for multiple parties
+            # e.g. Gerald Ford 1976 New York (Republican+Conservative)
+            year_state_cand_votes[year][po][candidate] += votes
+
+    for year in year_state_cand_votes:
+        for state in year_state_cand_votes[year]:
+            for invalid_candidate in [
+                "UNDERVOTES",
+                "OVERVOTES",
+                "unknown",
+                "BLANK VOTE/SCATTERING",
+                "BLANK VOTE",
+                "OVER VOTE",
+            ]:
+                if invalid_candidate in year_state_cand_votes[year][state]:
+                    del year_state_cand_votes[year][state][invalid_candidate]
+
+    return year_state_cand_votes, index
+
+
 def load_candidate_totals_and_parties(
     path: Path,
+    *,
+    mode: ValidationMode = "strict",
+    year_ec_votes: dict[Year, dict[StatePo, Vote]] | None = None,
 ) -> tuple[
     dict[Year, dict[StatePo, dict[Candidate, Vote]]],
     dict[Year, dict[Candidate, Party]],
 ]:
-    year_state_cand_votes = {}
-    year_candidate_parties = {}
-    year_state_total_votes = {}
-    with path.open() as f:
-        reader = csv.reader(f)
-        next(reader)
-        for row in reader:
-            (
-                year,
-                state,
-                po,
-                fips,
-                cen,
-                ic,
-                office,
-                candidate,
-                p_detailed,
-                writein,
-                votes,
-                total,
-                version,
-                notes,
-                simplified,
-            ) = row
-            year = int(year)
-            votes = int(votes)
-            total = int(total)
-
-            if candidate == "":
-                candidate = p_detailed
-                if candidate == "":
-                    if writein == "TRUE":
-                        candidate = "write in"
-                    elif writein == "NA":
-                        candidate = "unknown"
-                    else:
-                        print(year, state, po, candidate, p_detailed, writein)
-                        msg = "Not sufficient information for candidate."
-                        raise ValueError(msg)
-            if year not in year_state_cand_votes:
-                year_state_cand_votes[year] = {}
-                year_candidate_parties[year] = {}
-                year_state_total_votes[year] = {}
-
-            if candidate not in year_candidate_parties[year]:
-                year_candidate_parties[year][candidate] = {}
-
-            year_candidate_parties[year][candidate][p_detailed] = (
-                year_candidate_parties[year][candidate].get(p_detailed, 0) + votes
-            )
-
-            if po not in year_state_cand_votes[year]:
-                year_state_cand_votes[year][po] = {}
-                year_state_total_votes[year][po] = total
-
-            if year_state_total_votes[year][po] != total:
-                msg = "Different vote totals"
-                raise ValueError(msg)
-
-            if candidate not in year_state_cand_votes[year][po]:
-                year_state_cand_votes[year][po][candidate] = votes
-            else:
-                # Some entries include candidates running for multiple parties
-                # e.g. Gerald Ford 1976 New York (Republican+Conservative)
-                year_state_cand_votes[year][po][candidate] += votes
-
-        for year in year_state_total_votes:
-            for state in year_state_total_votes[year]:
-                if (
-                    sum(year_state_cand_votes[year][state].values())
-                    != year_state_total_votes[year][state]
-                ):
-                    msg = "Votes for candidates do not sum to total votes."
-                    raise ValueError(msg)
-                for invalid_candidate in [
-                    "UNDERVOTES",
-                    "OVERVOTES",
-                    "unknown",
-                    "BLANK VOTE/SCATTERING",
-                    "BLANK VOTE",
-                    "OVER VOTE",
-                ]:
-                    if invalid_candidate in year_state_cand_votes[year][state]:
-                        del year_state_cand_votes[year][state][invalid_candidate]
-
-        nominal_year_candidate_parties = {}
-        for year, candidate_parties in year_candidate_parties.items():
-            nominal_year_candidate_parties[year] = {}
-            for candidate, party_totals in candidate_parties.items():
-                nominal_year_candidate_parties[year][candidate] = max(
-                    party_totals,
-                    key=lambda x: party_totals[x],
-                )
-
-        return year_state_cand_votes, nominal_year_candidate_parties
+    year_state_cand_votes, index = load_votes(
+        path,
+        mode=mode,
+        year_ec_votes=year_ec_votes,
+    )
+    return year_state_cand_votes, {
+        year: index.nominal_parties(year) for year in year_state_cand_votes
+    }
@@ -3,14 +3,23 @@ from dataclasses import dataclass
 from fractions import Fraction
 from math import ceil
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import geopandas as gpd
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.patheffects import withStroke
 
-from proportional_ec.constants import PARTY_COLOUR, STATE_PO
+from proportional_ec.constants import STATE_PO
+from proportional_ec.identity import CandidateLabel
 from proportional_ec.summarise import aggregate_election_results
-from proportional_ec.typing import Candidate, Party, Seats, StatePo
+from proportional_ec.topojson import read_topojson_rings
+from proportional_ec.topology import HexTopology, build_hex_topology
+from proportional_ec.typing import Candidate, Seats, StatePo
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+    import numpy as np
+    import numpy.typing as npt
 
 TEXT_PATH_EFFECTS = [withStroke(linewidth=3, foreground="black")]
 
@@ -19,92 +28,71 @@ def normalise_state(state: str) -> StatePo:
     return STATE_PO[state.lower()]
 
 
-def load_topo_data(file_path: Path) -> gpd.GeoDataFrame:
+def load_topo_data(file_path: Path) -> "gpd.GeoDataFrame":
+    # Optional, the rendering path does not need it
+    import geopandas as gpd  # noqa: PLC0415
+
     gdf = gpd.read_file(file_path)
     gdf["name"] = gdf["name"].apply(normalise_state)
     return gdf
 
 
-def _hexagon_sort_order(points: tuple[tuple[float, float], ...]) -> tuple[float, float]:
-    top_left = max(points, key=lambda x: (x[1], -x[0]))
-    return -top_left[1], top_left[0]
+def load_topo_rings(
+    file_path: str | Path,
+) -> list[tuple[StatePo, list["npt.NDArray[np.float64]"]]]:
+    return [
+        (normalise_state(name), rings)
+        for name, rings in read_topojson_rings(Path(file_path))
+    ]
+
+
+def load_hex_topology(file_path: str | Path) -> HexTopology:
+    return build_hex_topology(load_topo_rings(file_path))
+
+
+def _geodataframe_rings(
+    gdf: "gpd.GeoDataFrame",
+) -> list[tuple[StatePo, list[Sequence[tuple[float, float]]]]]:
+    state_rings = []
+    for state, geom in zip(gdf.name, gdf.geometry, strict=True):
+        if geom.geom_type != "MultiPolygon":
+            msg = "Unexpected geometry type"
+            raise ValueError(msg)
+        state_rings.append(
+            (state, [polygon.exterior.coords for polygon in geom.geoms]),
+        )
+    return state_rings
 
 
 def generate_polygons_centroids_and_lines(
-    gdf: gpd.GeoDataFrame,
+    gdf: "gpd.GeoDataFrame",
 ) -> tuple[
     dict[StatePo, list[tuple[float, float]]],
     dict[StatePo, tuple[float, float]],
     set[tuple[float, float]],
 ]:
-    state_polygons = {}
-    state_centroids = {}
-    state_border_edges = {}
-    # Hexagon collections for each state
-    for state, geom in zip(gdf.name, gdf.geometry, strict=True):
-        if geom.geom_type != "MultiPolygon":
-            msg = "Unexpected geometry type"
-            raise ValueError(msg)
-        state_polygons[state] = []
-        edge_counts = {}
-
-        state_centroid = geom.centroid
-        closest_centroid_polygon = None
-        closest_centroid_distance = float("inf")
-
-        # Hexagons comprising a state
-        for polygon in geom.geoms:
-            # Find closest polygon to centroid of state
-            polygon_centroid = polygon.centroid
-            distance_to_centre = polygon_centroid.distance(state_centroid)
-            if distance_to_centre < closest_centroid_distance:
-                closest_centroid_polygon = polygon_centroid
-                closest_centroid_distance = distance_to_centre
-
-            # Get data for hexagon
-            exterior_coords = [  # Round all coords
-                tuple(round(value, 1) for value in coord)
-                for coord in polygon.exterior.coords
-            ]
-            state_polygons[state].append(exterior_coords)
-
-            # Count occurence of an edge inside a state.
-            # If only one occurence, it's on the border
-            for i in range(len(exterior_coords) - 1):
-                start = exterior_coords[i]
-                end = exterior_coords[i + 1]
-                edge = (min(start, end), max(start, end))
-                edge_counts[edge] = edge_counts.get(edge, 0) + 1
-
-        state_centroids[state] = next(zip(*closest_centroid_polygon.xy, strict=True))
-        # Ensure consistent order
-        state_polygons[state].sort(key=_hexagon_sort_order)
-
-        # Get external edges for state
-        state_border_edges[state] = {
-            edge for edge in edge_counts if edge_counts[edge] == 1
-        }
-
-    border_count = {}
-    for border_edges in state_border_edges.values():
-        for edge in border_edges:
-            border_count[edge] = border_count.get(edge, 0) + 1
-
-    state_borders = {edge for edge in border_count if border_count[edge] > 1}
-
-    return state_polygons, state_centroids, state_borders
+    topology = build_hex_topology(_geodataframe_rings(gdf))
+
+    state_polygons = {
+        state: [list(map(tuple, hexagon.tolist())) for hexagon in hexagons]
+        for state, hexagons in topology.state_polygons().items()
+    }
+    state_borders = {
+        (tuple(start), tuple(end)) for start, end in topology.border_lines().tolist()
+    }
+    return state_polygons, topology.state_centroids(), state_borders
 
 
 def draw_state_polygons(
     ax: plt.Axes,
     state_polygons: dict[StatePo, list[tuple[float, float]]],
     state_seats: dict[StatePo, dict[Candidate, Seats]],
-    candidate_party: dict[Candidate, Party],
+    candidate_labels: dict[Candidate, CandidateLabel],
     candidate_order: Sequence[Candidate],
 ) -> None:
     for state, polygons in state_polygons.items():
         colours = [
-            PARTY_COLOUR[candidate_party[candidate]]
+            candidate_labels[candidate].colour
             for candidate in candidate_order
             if candidate in state_seats[state]
             for _ in range(state_seats[state][candidate])
@@ -166,7 +154,7 @@ def draw_aggregate(
     ax: plt.Axes,
     extremities: Extremities,
     overall_results: dict[Candidate, Seats],
-    candidate_party: dict[Candidate, Party],
+    candidate_labels: dict[Candidate, CandidateLabel],
     candidate_order: Sequence[Candidate],
 ) -> None:
     # Go from bottom up, runner up at bottom, winner at top
@@ -188,7 +176,7 @@ def draw_aggregate(
             sub_bar_position,
             AGGREGATE_BAR_WIDTH,
             sub_bar_height,
-            facecolor=PARTY_COLOUR[candidate_party[candidate]],
+            facecolor=candidate_labels[candidate].colour,
             edgecolor="black",
             alpha=0.5,
         )
@@ -230,7 +218,7 @@ def draw_state_break_down(
     ax: plt.Axes,
     extremities: Extremities,
     state_seats: dict[StatePo, dict[Candidate, Seats]],
-    candidate_party: dict[Candidate, Party],
+    candidate_labels: dict[Candidate, CandidateLabel],
     candidate_order: Sequence[Candidate],
 ) -> None:
     state_spaces_per_column = ceil(Fraction(len(STATE_PO) / BREAK_DOWN_COLUMNS))
@@ -284,7 +272,7 @@ def draw_state_break_down(
                     state_candidate_result_position,
                     STATE_BOX_WIDTH,
                     STATE_BOX_HEIGHT,
-                    facecolor=PARTY_COLOUR[candidate_party[candidate]],
+                    facecolor=candidate_labels[candidate].colour,
                     edgecolor="black",
                     alpha=0.5,
                 )
@@ -329,25 +317,6 @@ def get_extremities(
     return Extremities(top, bottom, left, right)
 
 
-def normalise_name(candidate: Candidate) -> str:
-    candidate = candidate.replace('""', '"')
-
-    is_junior = candidate.endswith(" JR")
-    if is_junior:
-        candidate = candidate[:-3]
-
-    candidate = candidate.title()
-
-    if candidate.startswith("Mc"):
-        candidate = candidate[:2] + candidate[2].upper() + candidate[3:]
-
-    candidate = " ".join(reversed(candidate.split(", ")))
-
-    if is_junior:
-        candidate += " Jr."
-    return candidate
-
-
 LEGEND_FIGURE_OFFSET = 10
 
 
@@ -355,12 +324,12 @@ def draw_legend(
     ax: plt.Axes,
     extremities: Extremities,
     overall_results: dict[Candidate, Seats],
-    candidate_party: dict[Candidate, Party],
+    candidate_labels: dict[Candidate, CandidateLabel],
     candidate_order: Sequence[Candidate],
 ) -> None:
     handles = []
     for candidate in candidate_order:
-        party_colour = PARTY_COLOUR[candidate_party[candidate]]
+        party_colour = candidate_labels[candidate].colour
         handles.append(
             plt.Line2D(
                 [0],
@@ -369,7 +338,7 @@ def draw_legend(
                 color="w",
                 markerfacecolor=party_colour,
                 markersize=10,
-                label=f"{normalise_name(candidate)} ({overall_results[candidate]} EV{"s" if overall_results[candidate] != 1 else ""})",
+                label=f"{candidate_labels[candidate].name} ({overall_results[candidate]} EV{"s" if overall_results[candidate] != 1 else ""})",
             ),
         )
     xlim = ax.get_xlim()
@@ -395,36 +364,40 @@ def draw_legend(
     )
 
 
-def draw_ec_map(
-    out_path: str | Path,
-    topo_file: str | Path,
-    year: int,
-    state_seats: dict[StatePo, dict[Candidate, Seats]],
-    candidate_party: dict[Candidate, Party],
-) -> None:
-    overall_results = aggregate_election_results(state_seats)
+def map_candidate_order(overall_results: dict[Candidate, Seats]) -> list[Candidate]:
     candidate_order = sorted(
         overall_results,
         key=lambda x: overall_results[x],
         reverse=True,
     )
     candidate_order.append(candidate_order.pop(1))  # Winner on top, runner up on bottom
+    return candidate_order
 
-    state_polygons, state_centroids, border_lines = (
-        generate_polygons_centroids_and_lines(load_topo_data(topo_file))
-    )
 
-    fig, ax = plt.subplots(figsize=(20, 10))
+def render_ec_map(
+    year: int,
+    state_seats: dict[StatePo, dict[Candidate, Seats]],
+    candidate_labels: dict[Candidate, CandidateLabel],
+    topology: HexTopology,
+) -> Figure:
+    state_polygons = topology.state_polygons()
+    overall_results = aggregate_election_results(state_seats)
+    candidate_order = map_candidate_order(overall_results)
+
+    # Not managed by pyplot so figures can be rendered from worker threads
+    # and are freed once the caller drops them.
+    fig = Figure(figsize=(20, 10))
+    ax = fig.subplots()
 
     draw_state_polygons(
         ax,
         state_polygons,
         state_seats,
-        candidate_party,
+        candidate_labels,
         candidate_order,
     )
-    draw_borders(ax, border_lines)
-    draw_state_names(ax, state_centroids)
+    draw_borders(ax, topology.border_lines())
+    draw_state_names(ax, topology.state_centroids())
 
     extremities = get_extremities(state_polygons)
     candidate_order = sorted(
@@ -436,12 +409,12 @@ def draw_ec_map(
         ax,
         extremities,
         state_seats,
-        candidate_party,
+        candidate_labels,
         candidate_order,
     )
 
-    draw_aggregate(ax, extremities, overall_results, candidate_party, candidate_order)
-    draw_legend(ax, extremities, overall_results, candidate_party, candidate_order)
+    draw_aggregate(ax, extremities, overall_results, candidate_labels, candidate_order)
+    draw_legend(ax, extremities, overall_results, candidate_labels, candidate_order)
 
     ax.set_title(
         f"{year} Presidential Election",
@@ -454,4 +427,20 @@ def draw_ec_map(
     ax.set_aspect("equal")
     ax.axis("off")
 
-    plt.savefig(out_path, bbox_inches="tight", dpi=300)
+    return fig
+
+
+def write_ec_map(out_path: str | Path, fig: Figure) -> None:
+    fig.savefig(out_path, bbox_inches="tight", dpi=300)
+
+
+def draw_ec_map(
+    out_path: str | Path,
+    topo_file: str | Path,
+    year: int,
+    state_seats: dict[StatePo, dict[Candidate, Seats]],
+    candidate_labels: dict[Candidate, CandidateLabel],
+) -> None:
+    topology = load_hex_topology(topo_file)
+    fig = render_ec_map(year, state_seats, candidate_labels, topology)
+    write_ec_map(out_path, fig)
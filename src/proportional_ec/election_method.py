@@ -1,8 +1,24 @@
+import zlib
+from collections import Counter
+from dataclasses import dataclass
 from fractions import Fraction
+from itertools import combinations
 from math import floor
+from typing import Literal, get_args
+
+import numpy as np
+import numpy.typing as npt
 
 from proportional_ec.typing import Candidate, Seats, Vote
 
+TiePolicy = Literal["error", "votes", "lot", "enumerate"]
+TieKind = Literal["remainder", "over_allocation"]
+
+TIE_MESSAGES = {
+    "remainder": "Tie when allocating largest remainder seats.",
+    "over_allocation": "More seats allocated than available. Can happen if there are no fractional components for the droop quota.",
+}
+
 
 def _total_votes(candidate_votes: dict[Candidate, Vote]) -> int:
     return sum(candidate_votes.values())
@@ -12,10 +28,71 @@ def droop_quota(total_votes: int, available_seats: int) -> Fraction:
     return Fraction(total_votes, available_seats + 1)
 
 
+def hare_quota(total_votes: int, available_seats: int) -> Fraction:
+    return Fraction(total_votes, available_seats)
+
+
+@dataclass
+class EnumeratedTie:
+    candidate_votes: dict[Candidate, Vote]
+    available_seats: Seats
+    outcomes: list[dict[Candidate, Seats]]
+
+
+class TieBreaker:
+    # Settles the elections run_largest_remainder_election would raise for.
+    # "votes" favours the tied candidates with the most votes, "lot" draws
+    # them at random and "enumerate" keeps every possible outcome, returning
+    # the "votes" one. Lots are seeded by the tied election itself, so they
+    # do not depend on the order or process elections are run in.
+    def __init__(self, policy: TiePolicy = "error", seed: int | None = None) -> None:
+        if policy not in get_args(TiePolicy):
+            msg = f"Unknown tie policy: {policy!r}"
+            raise ValueError(msg)
+        self.policy = policy
+        self.seed = seed
+        # Ties broken of each kind, by this process
+        self.counts: Counter[TieKind] = Counter()
+        self.enumerated: list[EnumeratedTie] = []
+
+    def __repr__(self) -> str:
+        # Part of method_name, so stored results are keyed by the policy
+        return f"TieBreaker({self.policy!r}, seed={self.seed!r})"
+
+    def rng(self, election: object) -> np.random.Generator:
+        if self.seed is None:
+            return np.random.default_rng()
+        return np.random.default_rng([self.seed, zlib.crc32(repr(election).encode())])
+
+    def choose(
+        self,
+        kind: TieKind,
+        tied: list[Candidate],
+        picks: int,
+        candidate_votes: dict[Candidate, Vote],
+        available_seats: Seats,
+    ) -> list[list[Candidate]]:
+        # The ways of giving the contested seats to picks of the tied candidates
+        if self.policy == "error":
+            raise RuntimeError(TIE_MESSAGES[kind])
+        self.counts[kind] += 1
+
+        by_votes = sorted(tied, key=candidate_votes.__getitem__, reverse=True)
+        if self.policy == "votes":
+            return [by_votes[:picks]]
+        if self.policy == "lot":
+            order = self.rng(
+                (sorted(candidate_votes.items()), available_seats),
+            ).permutation(len(tied))
+            return [[tied[i] for i in order[:picks].tolist()]]
+        return [list(chosen) for chosen in combinations(by_votes, picks)]
+
+
 def run_largest_remainder_election(
     candidate_votes: dict[Candidate, Vote],
     available_seats: Seats,
     quota_size: Fraction,
+    tie_breaker: TieBreaker | None = None,
 ) -> dict[Candidate, Seats]:
     candidate_seats = {}
 
@@ -29,8 +106,31 @@ def run_largest_remainder_election(
 
     seats_allocated = sum(candidate_seats.values())
     if seats_allocated > available_seats:
-        msg = "More seats allocated than available. Can happen if there are no fractional components for the droop quota."
-        raise RuntimeError(msg)
+        # With a droop quota every candidate is on an exact multiple of the
+        # quota, so all seat holders are tied for the seats which don't exist
+        holders = [c for c in candidate_seats if candidate_seats[c] > 0]
+        picks = len(holders) - (seats_allocated - available_seats)
+        if tie_breaker is None or picks < 0:
+            raise RuntimeError(TIE_MESSAGES["over_allocation"])
+        outcomes = [
+            {
+                candidate: seats - (candidate in holders and candidate not in kept)
+                for candidate, seats in candidate_seats.items()
+            }
+            for kept in tie_breaker.choose(
+                "over_allocation",
+                holders,
+                picks,
+                candidate_votes,
+                available_seats,
+            )
+        ]
+        return _record_outcomes(
+            tie_breaker,
+            candidate_votes,
+            available_seats,
+            outcomes,
+        )
     seats_remaining = available_seats - seats_allocated
 
     if seats_remaining == 0:
@@ -42,15 +142,48 @@ def run_largest_remainder_election(
         reverse=True,
     )
 
-    for candidate in remainder_allocation_priority[:seats_remaining]:
-        candidate_seats[candidate] += 1
-
+    last_remainder = candidate_quota_remainders[
+        remainder_allocation_priority[seats_remaining - 1]
+    ]
     if (
-        candidate_quota_remainders[remainder_allocation_priority[seats_remaining - 1]]
+        last_remainder
         == candidate_quota_remainders[remainder_allocation_priority[seats_remaining]]
     ):
-        msg = "Tie when allocating largest remainder seats."
-        raise RuntimeError(msg)
+        if tie_breaker is None:
+            raise RuntimeError(TIE_MESSAGES["remainder"])
+        # Candidates above the tied remainder are certain of a seat
+        certain = [
+            c
+            for c in remainder_allocation_priority
+            if candidate_quota_remainders[c] > last_remainder
+        ]
+        tied = [
+            c
+            for c in remainder_allocation_priority
+            if candidate_quota_remainders[c] == last_remainder
+        ]
+        outcomes = [
+            {
+                candidate: seats + (candidate in certain or candidate in chosen)
+                for candidate, seats in candidate_seats.items()
+            }
+            for chosen in tie_breaker.choose(
+                "remainder",
+                tied,
+                seats_remaining - len(certain),
+                candidate_votes,
+                available_seats,
+            )
+        ]
+        return _record_outcomes(
+            tie_breaker,
+            candidate_votes,
+            available_seats,
+            outcomes,
+        )
+
+    for candidate in remainder_allocation_priority[:seats_remaining]:
+        candidate_seats[candidate] += 1
 
     if sum(candidate_seats.values()) != available_seats:
         msg = "Invalid number of seats allocated."
@@ -59,11 +192,192 @@ def run_largest_remainder_election(
     return candidate_seats
 
 
+def _record_outcomes(
+    tie_breaker: TieBreaker,
+    candidate_votes: dict[Candidate, Vote],
+    available_seats: Seats,
+    outcomes: list[dict[Candidate, Seats]],
+) -> dict[Candidate, Seats]:
+    for candidate_seats in outcomes:
+        if sum(candidate_seats.values()) != available_seats:
+            msg = "Invalid number of seats allocated."
+            raise RuntimeError(msg)
+    if tie_breaker.policy == "enumerate":
+        tie_breaker.enumerated.append(
+            EnumeratedTie(dict(candidate_votes), available_seats, outcomes),
+        )
+    return outcomes[0]
+
+
 def run_droop_quota_largest_remainder(
     candidate_votes: dict[Candidate, Vote],
     available_seats: Seats,
+    tie_breaker: TieBreaker | None = None,
 ) -> dict[Candidate, Seats]:
     total_votes = _total_votes(candidate_votes)
     quota_size = droop_quota(total_votes, available_seats)
 
-    return run_largest_remainder_election(candidate_votes, available_seats, quota_size)
+    return run_largest_remainder_election(
+        candidate_votes,
+        available_seats,
+        quota_size,
+        tie_breaker,
+    )
+
+
+def run_hare_quota_largest_remainder(
+    candidate_votes: dict[Candidate, Vote],
+    available_seats: Seats,
+    tie_breaker: TieBreaker | None = None,
+) -> dict[Candidate, Seats]:
+    total_votes = _total_votes(candidate_votes)
+    quota_size = hare_quota(total_votes, available_seats)
+
+    return run_largest_remainder_election(
+        candidate_votes,
+        available_seats,
+        quota_size,
+        tie_breaker,
+    )
+
+
+def largest_remainder_outcomes(
+    votes: npt.NDArray[np.int64],
+    available_seats: npt.NDArray[np.int64],
+    quota_seats: npt.NDArray[np.int64],
+    tie_order: npt.NDArray[np.generic] | None = None,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.bool_], npt.NDArray[np.bool_]]:
+    # Seats for votes of shape (..., candidates) with the same semantics as
+    # run_largest_remainder_election. A quota of total / quota_seats makes
+    # the quotas votes * quota_seats / total, so whole seats and remainders
+    # are exact integer quotients and residues over a shared denominator.
+    # Elections which that function raises for are flagged as over
+    # allocated or tied, and settled in favour of the candidates highest in
+    # tie_order (by default the earliest candidates).
+    n_candidates = votes.shape[-1]
+    if tie_order is None:
+        tie_order = np.zeros_like(votes)
+    total = votes.sum(axis=-1, keepdims=True)
+    seats, remainders = np.divmod(
+        votes * quota_seats[..., None],
+        np.maximum(total, 1),
+    )
+    seats_remaining = available_seats - seats.sum(axis=-1)
+
+    # Seat holders lowest in tie_order, then the latest candidates, give up
+    # the seats which don't exist
+    over_allocated = seats_remaining < 0
+    if over_allocated.any():
+        surrender = np.lexsort(
+            (
+                np.broadcast_to(-np.arange(n_candidates), votes.shape),
+                tie_order,
+                seats == 0,
+            ),
+            axis=-1,
+        )
+        surrender_rank = np.empty_like(surrender)
+        np.put_along_axis(
+            surrender_rank,
+            surrender,
+            np.arange(n_candidates),
+            axis=-1,
+        )
+        seats -= (seats > 0) & (surrender_rank < -seats_remaining[..., None])
+
+    # Stable, so equal remainders keep candidate order as sorted() would
+    priority = np.lexsort((-tie_order, -remainders), axis=-1)
+    ranked = np.take_along_axis(remainders, priority, axis=-1)
+    rank = np.empty_like(priority)
+    np.put_along_axis(rank, priority, np.arange(n_candidates), axis=-1)
+    seats += rank < seats_remaining[..., None]
+
+    # Tied when the last remainder given a seat equals the first left out
+    tied = (seats_remaining > 0) & (seats_remaining < n_candidates)
+    if n_candidates > 1:
+        boundary = np.clip(seats_remaining, 1, n_candidates - 1)[..., None]
+        tied &= (
+            np.take_along_axis(ranked, boundary - 1, axis=-1)
+            == np.take_along_axis(ranked, boundary, axis=-1)
+        )[..., 0]
+    return seats, over_allocated, tied
+
+
+def policy_tie_order(
+    tie_policy: TiePolicy,
+    votes: npt.NDArray[np.int64],
+    rng: np.random.Generator,
+) -> npt.NDArray[np.generic] | None:
+    if tie_policy == "enumerate":
+        msg = "Tied outcomes can only be enumerated one election at a time."
+        raise ValueError(msg)
+    if tie_policy == "votes":
+        return votes
+    if tie_policy == "lot":
+        return rng.random(votes.shape)
+    return None
+
+
+def batched_largest_remainder(
+    votes: npt.NDArray[np.int64],
+    available_seats: npt.NDArray[np.int64],
+    quota_seats: npt.NDArray[np.int64],
+    tie_breaker: TieBreaker | None = None,
+) -> npt.NDArray[np.int64]:
+    # Every tie is settled on its own, one never aborts the rest of the batch
+    policy = "error" if tie_breaker is None else tie_breaker.policy
+    order = None
+    if policy != "error":
+        # Lots are seeded by the batch, like single elections
+        rng = tie_breaker.rng(zlib.crc32(votes.tobytes()))
+        order = policy_tie_order(policy, votes, rng)
+    seats, over_allocated, tied = largest_remainder_outcomes(
+        votes,
+        available_seats,
+        quota_seats,
+        order,
+    )
+    for kind, flags in (("over_allocation", over_allocated), ("remainder", tied)):
+        if not flags.any():
+            continue
+        if policy == "error":
+            raise RuntimeError(TIE_MESSAGES[kind])
+        tie_breaker.counts[kind] += int(flags.sum())
+    return seats
+
+
+def droop_quota_seats(available_seats: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    # Denominator of droop_quota in terms of seats
+    return available_seats + 1
+
+
+def hare_quota_seats(available_seats: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    return available_seats
+
+
+def batched_droop_quota_largest_remainder(
+    votes: npt.NDArray[np.int64],
+    available_seats: npt.NDArray[np.int64],
+    tie_breaker: TieBreaker | None = None,
+) -> npt.NDArray[np.int64]:
+    available_seats = np.asarray(available_seats, dtype=np.int64)
+    return batched_largest_remainder(
+        votes,
+        available_seats,
+        droop_quota_seats(available_seats),
+        tie_breaker,
+    )
+
+
+def batched_hare_quota_largest_remainder(
+    votes: npt.NDArray[np.int64],
+    available_seats: npt.NDArray[np.int64],
+    tie_breaker: TieBreaker | None = None,
+) -> npt.NDArray[np.int64]:
+    available_seats = np.asarray(available_seats, dtype=np.int64)
+    return batched_largest_remainder(
+        votes,
+        available_seats,
+        hare_quota_seats(available_seats),
+        tie_breaker,
+    )
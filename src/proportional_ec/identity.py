@@ -0,0 +1,171 @@
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from proportional_ec.constants import CANDIDATE_ALIASES, PARTY_COLOUR
+from proportional_ec.typing import Candidate, Party, Year
+from proportional_ec.validate import factorize
+
+JUNIOR_SUFFIX = re.compile(r",? JR\.?$", re.IGNORECASE)
+# Surname and quoted nickname, e.g. PAUL, RONALD "RON"
+NICKNAME = re.compile(r'^([^,]+), [^"]*"([^"]+)"')
+
+
+def _unescape(candidate: Candidate) -> Candidate:
+    # Undoes the doubled quote escaping and spells every junior suffix " JR"
+    candidate = " ".join(candidate.replace('""', '"').split())
+    return JUNIOR_SUFFIX.sub(" JR", candidate)
+
+
+def candidate_key(candidate: Candidate) -> str:
+    return _unescape(candidate).upper()
+
+
+def normalise_name(candidate: Candidate) -> str:
+    candidate = candidate_key(candidate)
+
+    is_junior = candidate.endswith(" JR")
+    if is_junior:
+        candidate = candidate[:-3]
+
+    candidate = candidate.title()
+
+    if candidate.startswith("Mc"):
+        candidate = candidate[:2] + candidate[2].upper() + candidate[3:]
+
+    candidate = " ".join(reversed(candidate.split(", ")))
+
+    if is_junior:
+        candidate += " Jr."
+    return candidate
+
+
+def _resolve_keys(keys: list[str]) -> list[str]:
+    # Known aliases first, then "SURNAME, NICKNAME" matches the spelling
+    # which quotes that nickname.
+    keys = [CANDIDATE_ALIASES.get(key, key) for key in keys]
+    nicknames = {}
+    for key in keys:
+        match = NICKNAME.match(key)
+        if match is not None:
+            nicknames.setdefault(f"{match[1]}, {match[2]}", key)
+    spelled_out = set(nicknames.values())
+    return [key if key in spelled_out else nicknames.get(key, key) for key in keys]
+
+
+@dataclass(frozen=True)
+class CandidateLabel:
+    # How a candidate is shown on maps
+    name: str
+    party: Party
+    party_colour: str | None
+
+    @property
+    def colour(self) -> str:
+        if self.party_colour is None:
+            msg = f"No colour for the {self.party} party of {self.name}."
+            raise KeyError(msg)
+        return self.party_colour
+
+
+@dataclass(frozen=True)
+class CandidateIndex:
+    # Canonical name of candidate i, its normalised key in the data's case
+    names: list[Candidate]
+    parties: list[Party]
+    # PARTY_COLOUR of party i, None for parties without a colour
+    party_colours: list[str | None]
+    years: list[Year]
+    # Party id with the most votes for each (year, candidate), -1 where the
+    # candidate did not run. Ties go to the party seen first that year.
+    primary_party: npt.NDArray[np.intp]
+    # Candidate ids running each year, in order of first appearance
+    year_candidates: dict[Year, npt.NDArray[np.intp]]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _year_parties(self, year: Year) -> list[tuple[int, int]]:
+        candidate_ids = self.year_candidates[year]
+        party_ids = self.primary_party[self.years.index(year), candidate_ids]
+        return list(zip(candidate_ids.tolist(), party_ids.tolist(), strict=True))
+
+    def nominal_parties(self, year: Year) -> dict[Candidate, Party]:
+        return {
+            self.names[candidate]: self.parties[party]
+            for candidate, party in self._year_parties(year)
+        }
+
+    def labels(self, year: Year) -> dict[Candidate, CandidateLabel]:
+        return {
+            self.names[candidate]: CandidateLabel(
+                normalise_name(self.names[candidate]),
+                self.parties[party],
+                self.party_colours[party],
+            )
+            for candidate, party in self._year_parties(year)
+        }
+
+
+def build_candidate_index(
+    years: npt.NDArray[np.int64],
+    candidates: npt.NDArray[np.str_],
+    parties: npt.NDArray[np.str_],
+    votes: npt.NDArray[np.int64],
+) -> tuple[CandidateIndex, npt.NDArray[np.intp]]:
+    # One entry per row of a votes file. Also returns the candidate id of
+    # every row.
+    raw_names, raw_code = factorize(candidates)
+    spellings = [_unescape(name) for name in raw_names]
+    keys = _resolve_keys([spelling.upper() for spelling in spellings])
+    key_ids = {key: i for i, key in enumerate(dict.fromkeys(keys))}
+    raw_ids = np.array([key_ids[key] for key in keys], dtype=np.intp)
+
+    # Names keep the case of the data, e.g. for the "write in" fallback
+    key_spellings = {}
+    for spelling in spellings:
+        key_spellings.setdefault(spelling.upper(), spelling)
+    names = [key_spellings.get(key, key) for key in key_ids]
+
+    party_names, party = factorize(parties)
+    year_values, year = np.unique(years, return_inverse=True)
+    candidate = raw_ids[raw_code]
+    n_candidates = len(names)
+    n_parties = len(party_names)
+
+    # Vote totals and first row of every (year, candidate, party)
+    entries, entry = np.unique(
+        (year * n_candidates + candidate) * n_parties + party,
+        return_inverse=True,
+    )
+    totals = np.zeros(len(entries), dtype=np.int64)
+    np.add.at(totals, entry, votes)
+    first_row = np.full(len(entries), len(entry), dtype=np.int64)
+    np.minimum.at(first_row, entry, np.arange(len(entry)))
+
+    runs, run_party = np.divmod(entries, n_parties)
+    order = np.lexsort((first_row, -totals, runs))
+    chosen = order[np.diff(runs[order], prepend=-1) != 0]
+    primary_party = np.full((len(year_values), n_candidates), -1, dtype=np.intp)
+    primary_party.flat[runs[chosen]] = run_party[chosen]
+
+    # Candidates of each year in the order the loader meets them
+    run_first_row = np.full(len(year_values) * n_candidates, len(entry), dtype=np.int64)
+    np.minimum.at(run_first_row, runs, first_row)
+    year_candidates = {}
+    for i, election in enumerate(year_values.tolist()):
+        first_rows = run_first_row[i * n_candidates : (i + 1) * n_candidates]
+        running = np.flatnonzero(first_rows < len(entry))
+        year_candidates[election] = running[np.argsort(first_rows[running])]
+
+    index = CandidateIndex(
+        names,
+        party_names,
+        [PARTY_COLOUR.get(name) for name in party_names],
+        year_values.tolist(),
+        primary_party,
+        year_candidates,
+    )
+    return index, candidate
@@ -0,0 +1,323 @@
+import asyncio
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+import numpy.typing as npt
+from matplotlib.figure import Figure
+
+from proportional_ec.draw import (
+    load_topo_rings,
+    render_ec_map,
+    write_ec_map,
+)
+from proportional_ec.election import run_election
+from proportional_ec.identity import CandidateLabel
+from proportional_ec.topology import HexTopology, build_hex_topology
+from proportional_ec.typing import Candidate, Seats, StatePo, Vote, Year
+
+_DONE = object()  # End of stream marker passed between stage queues
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[Any], Any]
+    executor: Literal["thread", "process"] = "thread"
+    workers: int = 1
+    # Items this is true for pass straight through, never reaching an executor
+    skip: Callable[[Any], bool] | None = None
+
+
+@dataclass
+class StageStats:
+    name: str
+    processed: int = 0
+    skipped: int = 0
+    busy_seconds: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    started: float | None = None
+    finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<14} processed={self.processed:<6} "
+            f"skipped={self.skipped:<6} "
+            f"queue={self.queue_depth} (max {self.max_queue_depth}) "
+            f"busy={self.busy_seconds:.2f}s throughput={self.throughput:.2f}/s"
+        )
+
+
+def format_stage_stats(stats: Iterable[StageStats]) -> str:
+    return "\n".join(str(stage_stats) for stage_stats in stats)
+
+
+@dataclass
+class _StageQueue:
+    # A bounded queue feeding a stage, which keeps the stage's queue depth
+    # up to date on every put and get. Depths count items only, never the
+    # end of stream marker.
+    queue: asyncio.Queue
+    stats: StageStats | None = None
+
+    def _count(self, item: object, change: int) -> None:
+        if self.stats is None or item is _DONE:
+            return
+        self.stats.queue_depth += change
+        self.stats.max_queue_depth = max(
+            self.stats.max_queue_depth,
+            self.stats.queue_depth,
+        )
+
+    async def put(self, item: object) -> None:
+        await self.queue.put(item)
+        self._count(item, 1)
+
+    def put_nowait(self, item: object) -> None:
+        self.queue.put_nowait(item)
+        self._count(item, 1)
+
+    async def get(self) -> Any:  # noqa: ANN401
+        item = await self.queue.get()
+        self._count(item, -1)
+        return item
+
+
+async def _feed(items: Iterable[Any], outbox: _StageQueue) -> None:
+    for item in items:
+        await outbox.put(item)  # Blocks while the first stage is saturated
+    await outbox.put(_DONE)
+
+
+async def _run_stage(
+    stage: Stage,
+    stats: StageStats,
+    inbox: _StageQueue,
+    outbox: _StageQueue,
+    executor: Executor,
+) -> None:
+    loop = asyncio.get_running_loop()
+
+    async def worker() -> None:
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                # Leave the marker for the other workers of this stage
+                inbox.put_nowait(_DONE)
+                return
+
+            if stats.started is None:
+                stats.started = time.perf_counter()
+            if stage.skip is not None and stage.skip(item):
+                stats.skipped += 1
+                result = item
+            else:
+                start = time.perf_counter()
+                result = await loop.run_in_executor(executor, stage.func, item)
+                stats.busy_seconds += time.perf_counter() - start
+                stats.processed += 1
+
+            await outbox.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(stage.workers)))
+    stats.finished = time.perf_counter()
+    await outbox.put(_DONE)
+
+
+async def _drain(inbox: _StageQueue, sink: Callable[[Any], None] | None) -> None:
+    while True:
+        item = await inbox.get()
+        if item is _DONE:
+            return
+        if sink is not None:
+            sink(item)
+
+
+async def _monitor(
+    stats: list[StageStats],
+    report: Callable[[list[StageStats]], None],
+    report_interval: float,
+) -> None:
+    while True:
+        report(stats)
+        await asyncio.sleep(report_interval)
+
+
+async def run_pipeline(  # noqa: PLR0913, options are keyword only
+    items: Iterable[Any],
+    stages: list[Stage],
+    *,
+    queue_size: int = 2,
+    sink: Callable[[Any], None] | None = None,
+    report: Callable[[list[StageStats]], None] | None = None,
+    report_interval: float = 1.0,
+) -> list[StageStats]:
+    if not stages:
+        msg = "At least one stage is required."
+        raise ValueError(msg)
+    if queue_size < 1:
+        msg = "Queue size must be positive so that backpressure applies."
+        raise ValueError(msg)
+
+    # queues[i] feeds stages[i], the final queue feeds the sink
+    stats = [StageStats(stage.name) for stage in stages]
+    queues = [
+        _StageQueue(asyncio.Queue(queue_size), stage_stats) for stage_stats in stats
+    ]
+    queues.append(_StageQueue(asyncio.Queue(queue_size)))
+
+    with ExitStack() as stack:
+        executors = {}
+        thread_workers = sum(s.workers for s in stages if s.executor == "thread")
+        process_workers = sum(s.workers for s in stages if s.executor == "process")
+        if thread_workers:
+            executors["thread"] = stack.enter_context(
+                ThreadPoolExecutor(thread_workers),
+            )
+        if process_workers:
+            executors["process"] = stack.enter_context(
+                ProcessPoolExecutor(process_workers),
+            )
+
+        tasks = [
+            asyncio.ensure_future(_feed(items, queues[0])),
+            *(
+                asyncio.ensure_future(
+                    _run_stage(
+                        stage,
+                        stage_stats,
+                        queues[i],
+                        queues[i + 1],
+                        executors[stage.executor],
+                    ),
+                )
+                for i, (stage, stage_stats) in enumerate(
+                    zip(stages, stats, strict=True),
+                )
+            ),
+            asyncio.ensure_future(_drain(queues[-1], sink)),
+        ]
+        monitors = []
+        if report is not None:
+            monitors.append(
+                asyncio.ensure_future(_monitor(stats, report, report_interval)),
+            )
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in (*monitors, *tasks):
+                task.cancel()
+            await asyncio.gather(*monitors, *tasks, return_exceptions=True)
+        if report is not None:
+            report(stats)  # Final figures, the monitor may be mid sleep
+
+    return stats
+
+
+@dataclass
+class ElectionJob:
+    year: Year
+    topo_file: Path
+    out_path: Path
+    state_candidate_counts: dict[StatePo, dict[Candidate, Vote]]
+    state_ec_votes: dict[StatePo, Seats]
+    candidate_labels: dict[Candidate, CandidateLabel]
+    state_seats: dict[StatePo, dict[Candidate, Seats]] | None = None
+    topo_rings: list[tuple[StatePo, list[npt.NDArray[np.float64]]]] | None = field(
+        default=None,
+        repr=False,
+    )
+    topology: HexTopology | None = field(default=None, repr=False)
+    figure: Figure | None = field(default=None, repr=False)
+
+
+def _load_data_stage(job: ElectionJob) -> ElectionJob:
+    job.topo_rings = load_topo_rings(job.topo_file)
+    return job
+
+
+def _apportionment_stage(
+    election_method: Callable[[dict[Candidate, Vote], Seats], dict[Candidate, Seats]],
+    job: ElectionJob,
+) -> ElectionJob:
+    job.state_seats = run_election(
+        election_method,
+        job.state_candidate_counts,
+        job.state_ec_votes,
+    )
+    return job
+
+
+def _has_seats(job: ElectionJob) -> bool:
+    # Already computed by the caller
+    return job.state_seats is not None
+
+
+def _geometry_stage(job: ElectionJob) -> ElectionJob:
+    job.topology = build_hex_topology(job.topo_rings)
+    job.topo_rings = None
+    return job
+
+
+def _render_stage(job: ElectionJob) -> ElectionJob:
+    job.figure = render_ec_map(
+        job.year,
+        job.state_seats,
+        job.candidate_labels,
+        job.topology,
+    )
+    job.topology = None
+    return job
+
+
+def _write_stage(job: ElectionJob) -> ElectionJob:
+    write_ec_map(job.out_path, job.figure)
+    job.figure = None
+    return job
+
+
+def election_stages(
+    election_method: Callable[[dict[Candidate, Vote], Seats], dict[Candidate, Seats]],
+    *,
+    processes: int = 1,
+    io_threads: int = 1,
+) -> list[Stage]:
+    # Apportionment and geometry are pure python and hold the GIL, so they
+    # go to a process pool. Matplotlib figures stay in this process.
+    cpu_executor = "process" if processes > 0 else "thread"
+    cpu_workers = max(processes, 1)
+    # Apportionment comes before the tiles are loaded, so only the votes are
+    # sent to its processes.
+    return [
+        Stage(
+            "apportionment",
+            partial(_apportionment_stage, election_method),
+            cpu_executor,
+            cpu_workers,
+            skip=_has_seats,
+        ),
+        Stage("data", _load_data_stage, "thread", io_threads),
+        Stage("geometry", _geometry_stage, cpu_executor, cpu_workers),
+        Stage("render", _render_stage, "thread", 1),
+        Stage("write", _write_stage, "thread", io_threads),
+    ]
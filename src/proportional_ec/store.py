@@ -0,0 +1,298 @@
+import hashlib
+import json
+import sqlite3
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from proportional_ec.election import run_election
+from proportional_ec.election_method import TieKind
+from proportional_ec.typing import Candidate, Seats, StatePo, Vote, Year
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+ElectionMethod = Callable[[dict[Candidate, Vote], Seats], dict[Candidate, Seats]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    year INTEGER NOT NULL,
+    method TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    state_seats TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    ties TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (year, method, scenario)
+);
+CREATE INDEX IF NOT EXISTS results_input_hash ON results (input_hash);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+# Part of every input hash, bump it when stored results become stale.
+# Version 2 stores the ties broken with each result.
+STORE_VERSION = 2
+
+
+def _argument_repr(value: object) -> str:
+    argument = repr(value)
+    # Default reprs hold the memory address, which changes every run
+    if " at 0x" in argument:
+        msg = f"Argument {argument} has no stable repr to store results under."
+        raise ValueError(msg)
+    return argument
+
+
+def method_name(election_method: ElectionMethod) -> str:
+    # Stored results are keyed by this name, so it has to be the same in
+    # every run and differ between methods. Lambdas, nested functions and
+    # callable instances have no such name.
+    if isinstance(election_method, partial):
+        arguments = [_argument_repr(arg) for arg in election_method.args] + [
+            f"{key}={_argument_repr(value)}"
+            for key, value in sorted(election_method.keywords.items())
+        ]
+        return f"{method_name(election_method.func)}({', '.join(arguments)})"
+    qualname = getattr(election_method, "__qualname__", None)
+    if not isinstance(qualname, str) or "<" in qualname:
+        msg = (
+            f"Election method {election_method!r} has no stable name to store "
+            "results under, use a module level function."
+        )
+        raise ValueError(msg)
+    return f"{election_method.__module__}.{qualname}"
+
+
+def election_input_hash(
+    election_method: ElectionMethod,
+    state_candidate_counts: dict[StatePo, dict[Candidate, Vote]],
+    state_ec_votes: dict[StatePo, Seats],
+) -> str:
+    # Only the seats of states that vote affect the result. Candidates keep
+    # the order given, tie policies pick between equal candidates by it.
+    states = sorted(state_candidate_counts)
+    canonical = json.dumps(
+        [
+            STORE_VERSION,
+            method_name(election_method),
+            [[state, list(state_candidate_counts[state].items())] for state in states],
+            [[state, state_ec_votes[state]] for state in states],
+        ],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def run_election_counting_ties(
+    election_method: ElectionMethod,
+    state_candidate_counts: dict[StatePo, dict[Candidate, Vote]],
+    state_ec_votes: dict[StatePo, Seats],
+) -> tuple[dict[StatePo, dict[Candidate, Seats]], Counter[TieKind]]:
+    # Worker processes have their own copy of the tie breaker, so the ties
+    # of each election are sent back with its result
+    tie_breaker = None
+    if isinstance(election_method, partial):
+        tie_breaker = election_method.keywords.get("tie_breaker")
+    before = Counter() if tie_breaker is None else tie_breaker.counts.copy()
+    state_seats = run_election(election_method, state_candidate_counts, state_ec_votes)
+    after = Counter() if tie_breaker is None else tie_breaker.counts
+    return state_seats, after - before
+
+
+@dataclass
+class StoredResult:
+    year: Year
+    method: str
+    scenario: str
+    state_seats: dict[StatePo, dict[Candidate, Seats]]
+
+
+@dataclass
+class StoreStats:
+    hits: int
+    misses: int
+    evictions: int
+    max_entries: int
+    entries: int
+
+
+class ResultStore:
+    def __init__(self, path: str | Path = ":memory:", max_entries: int = 4096) -> None:
+        if max_entries < 1:
+            msg = "The store must be able to hold at least one result."
+            raise ValueError(msg)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._connection = sqlite3.connect(str(path))
+        self._connection.executescript(_SCHEMA)
+        columns = [
+            column
+            for _, column, *_ in self._connection.execute("PRAGMA table_info(results)")
+        ]
+        if "ties" not in columns:
+            # Written before version 2, these results never match a hash again
+            with self._connection:
+                self._connection.execute(
+                    "ALTER TABLE results ADD COLUMN ties TEXT NOT NULL DEFAULT '{}'",
+                )
+        (self._clock,) = self._connection.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM results",
+        ).fetchone()
+
+    def __enter__(self) -> "Self":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __len__(self) -> int:
+        (entries,) = self._connection.execute(
+            "SELECT COUNT(*) FROM results",
+        ).fetchone()
+        return entries
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def get(self, input_hash: str) -> dict[StatePo, dict[Candidate, Seats]] | None:
+        row = self._connection.execute(
+            "SELECT state_seats FROM results WHERE input_hash = ? LIMIT 1",
+            (input_hash,),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        with self._connection:
+            self._connection.execute(
+                "UPDATE results SET last_used = ? WHERE input_hash = ?",
+                (self._tick(), input_hash),
+            )
+        return json.loads(row[0])
+
+    def ties(self, input_hash: str) -> Counter[TieKind]:
+        # Ties broken computing a stored result, without counting as a hit
+        row = self._connection.execute(
+            "SELECT ties FROM results WHERE input_hash = ? LIMIT 1",
+            (input_hash,),
+        ).fetchone()
+        return Counter() if row is None else Counter(json.loads(row[0]))
+
+    def put(  # noqa: PLR0913, options are keyword only
+        self,
+        input_hash: str,
+        state_seats: dict[StatePo, dict[Candidate, Seats]],
+        *,
+        year: Year,
+        method: str,
+        scenario: str,
+        ties: Counter[TieKind] | None = None,
+    ) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    year,
+                    method,
+                    scenario,
+                    input_hash,
+                    json.dumps(state_seats, separators=(",", ":")),
+                    self._tick(),
+                    json.dumps(dict(ties or {}), separators=(",", ":")),
+                ),
+            )
+            # Least recently used results go first
+            evicted = self._connection.execute(
+                """
+                DELETE FROM results WHERE rowid IN (
+                    SELECT rowid FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            ).rowcount
+        self.evictions += evicted
+
+    def query(
+        self,
+        year: Year | None = None,
+        method: str | None = None,
+        scenario: str | None = None,
+    ) -> list[StoredResult]:
+        conditions = []
+        parameters = []
+        for column, value in (
+            ("year", year),
+            ("method", method),
+            ("scenario", scenario),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        rows = self._connection.execute(
+            f"SELECT year, method, scenario, state_seats FROM results {where} "  # noqa: S608
+            "ORDER BY year, method, scenario",
+            parameters,
+        ).fetchall()
+        return [
+            StoredResult(year, method, scenario, json.loads(state_seats))
+            for year, method, scenario, state_seats in rows
+        ]
+
+    def stats(self) -> StoreStats:
+        return StoreStats(
+            self.hits,
+            self.misses,
+            self.evictions,
+            self.max_entries,
+            len(self),
+        )
+
+    def run_election(
+        self,
+        election_method: ElectionMethod,
+        state_candidate_counts: dict[StatePo, dict[Candidate, Vote]],
+        state_ec_votes: dict[StatePo, Seats],
+        *,
+        year: Year,
+        scenario: str = "baseline",
+    ) -> dict[StatePo, dict[Candidate, Seats]]:
+        # run_election, memoized
+        input_hash = election_input_hash(
+            election_method,
+            state_candidate_counts,
+            state_ec_votes,
+        )
+        state_seats = self.get(input_hash)
+        if state_seats is None:
+            state_seats, ties = run_election_counting_ties(
+                election_method,
+                state_candidate_counts,
+                state_ec_votes,
+            )
+        else:
+            ties = self.ties(input_hash)
+
+        # Also records the (year, method, scenario) of hits found under another label
+        self.put(
+            input_hash,
+            state_seats,
+            year=year,
+            method=method_name(election_method),
+            scenario=scenario,
+            ties=ties,
+        )
+        return state_seats
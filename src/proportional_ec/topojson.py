@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+
+def decode_arcs(
+    arcs: list[list[list[float]]],
+    transform: dict[str, list[float]] | None,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.intp]]:
+    # All arcs as one (N, 2) array, arc i is points[offsets[i]:offsets[i + 1]]
+    offsets = np.zeros(len(arcs) + 1, dtype=np.intp)
+    np.cumsum([len(arc) for arc in arcs], out=offsets[1:])
+
+    coordinates = [point[:2] for arc in arcs for point in arc]
+    if transform is None:
+        return np.array(coordinates, dtype=np.float64), offsets
+
+    # Quantized arcs are delta encoded. Integer running sums are exact, so
+    # the whole file is summed at once and each arc rebased to its start.
+    deltas = np.array(coordinates, dtype=np.int64)
+    positions = np.cumsum(deltas, axis=0)
+    arc_base = positions[offsets[:-1]] - deltas[offsets[:-1]]
+    positions -= np.repeat(arc_base, np.diff(offsets), axis=0)
+
+    scale = np.asarray(transform["scale"], dtype=np.float64)
+    translate = np.asarray(transform["translate"], dtype=np.float64)
+    return positions * scale + translate, offsets
+
+
+def _ring_points(
+    ring: list[int],
+    points: npt.NDArray[np.float64],
+    offsets: npt.NDArray[np.intp],
+) -> npt.NDArray[np.float64]:
+    # Negative indices refer to the reversed arc ~i. Consecutive arcs share
+    # an end point, so all but the first arc drop their first point.
+    parts = []
+    for i, arc in enumerate(ring):
+        if arc >= 0:
+            part = points[offsets[arc] : offsets[arc + 1]]
+        else:
+            part = points[offsets[~arc] : offsets[~arc + 1]][::-1]
+        parts.append(part if i == 0 else part[1:])
+    return np.concatenate(parts)
+
+
+def read_topojson_rings(
+    path: Path,
+    object_name: str | None = None,
+    name_property: str = "name",
+) -> list[tuple[str, list[npt.NDArray[np.float64]]]]:
+    with path.open() as f:
+        topology = json.load(f)
+
+    if topology.get("type") != "Topology":
+        msg = f"{path} is not a TopoJSON topology."
+        raise ValueError(msg)
+
+    if object_name is None:
+        object_name = next(iter(topology["objects"]))
+    collection = topology["objects"][object_name]
+
+    points, offsets = decode_arcs(topology["arcs"], topology.get("transform"))
+
+    named_rings = []
+    for geometry in collection["geometries"]:
+        if geometry["type"] == "Polygon":
+            polygons = [geometry["arcs"]]
+        elif geometry["type"] == "MultiPolygon":
+            polygons = geometry["arcs"]
+        else:
+            msg = "Unexpected geometry type"
+            raise ValueError(msg)
+
+        # Only exterior rings, tiles have no holes
+        named_rings.append(
+            (
+                geometry["properties"][name_property],
+                [_ring_points(polygon[0], points, offsets) for polygon in polygons],
+            ),
+        )
+    return named_rings
@@ -0,0 +1,215 @@
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from itertools import pairwise
+
+import numpy as np
+import numpy.typing as npt
+
+from proportional_ec.typing import StatePo
+
+COORDINATE_DECIMALS = 1
+
+
+@dataclass(frozen=True)
+class HexTopology:
+    # Unique rounded vertices, sorted by (x, y) so that comparing vertex
+    # indices is the same as comparing coordinate tuples.
+    vertices: npt.NDArray[np.float64]
+    # Closed rings of vertex indices, the ring of hexagon i runs from
+    # ring_offsets[i] up to ring_offsets[i + 1]
+    ring_vertices: npt.NDArray[np.intp]
+    ring_offsets: npt.NDArray[np.intp]
+    # Hexagons of states[i] are state_offsets[i]:state_offsets[i + 1]
+    states: tuple[StatePo, ...]
+    state_offsets: npt.NDArray[np.intp]
+    # Centroid of the hexagon closest to the centre of each state
+    centroids: npt.NDArray[np.float64]
+    # (start, end) vertex index pairs of edges separating two states
+    border_edges: npt.NDArray[np.intp]
+
+    def hexagons(self, state: StatePo) -> list[npt.NDArray[np.float64]]:
+        i = self.states.index(state)
+        return [
+            self.vertices[self.ring_vertices[start:end]]
+            for start, end in zip(
+                self.ring_offsets[self.state_offsets[i] : self.state_offsets[i + 1]],
+                self.ring_offsets[
+                    self.state_offsets[i] + 1 : self.state_offsets[i + 1] + 1
+                ],
+                strict=True,
+            )
+        ]
+
+    def state_polygons(self) -> dict[StatePo, list[npt.NDArray[np.float64]]]:
+        return {state: self.hexagons(state) for state in self.states}
+
+    def state_centroids(self) -> dict[StatePo, tuple[float, float]]:
+        return {
+            state: tuple(centroid)
+            for state, centroid in zip(
+                self.states,
+                self.centroids.tolist(),
+                strict=True,
+            )
+        }
+
+    def border_lines(self) -> npt.NDArray[np.float64]:
+        return self.vertices[self.border_edges]
+
+
+def _sequential_sums(
+    values: npt.NDArray[np.float64],
+    segments: npt.NDArray[np.intp],
+    n_segments: int,
+) -> npt.NDArray[np.float64]:
+    # Sum each segment strictly left to right (np.add.reduceat uses pairwise
+    # summation) by padding segments into rows and accumulating along them.
+    starts = np.searchsorted(segments, np.arange(n_segments))
+    columns = np.arange(len(values)) - starts[segments]
+    rows = np.zeros((n_segments, columns.max() + 1 if len(values) else 1))
+    rows[segments, columns] = values
+    return np.add.accumulate(rows, axis=1)[:, -1]
+
+
+def _fan_centroids(
+    coords: npt.NDArray[np.float64],
+    ring_offsets: npt.NDArray[np.intp],
+    segments: npt.NDArray[np.intp],
+    n_segments: int,
+) -> npt.NDArray[np.float64]:
+    # Centroid of each group of rings from triangle fans around the first
+    # point of each ring. This follows the order of operations of GEOS, so
+    # equidistant hexagons resolve the same way as the shapely geometries.
+    is_edge = np.ones(len(coords) - 1, dtype=bool)
+    is_edge[ring_offsets[1:-1] - 1] = False
+    ring_ids = _segment_ids(ring_offsets)[:-1][is_edge]
+    start, end = coords[:-1][is_edge], coords[1:][is_edge]
+
+    # Clockwise rings add area, counter-clockwise rings subtract it
+    x, y = coords[:-1, 0], coords[:-1, 1]
+    cross = x * coords[1:, 1] - coords[1:, 0] * y
+    cross[~is_edge] = 0
+    ring_sign = np.where(np.add.reduceat(cross, ring_offsets[:-1]) > 0, -1.0, 1.0)
+
+    edge_segments = segments[ring_ids]
+    base = coords[ring_offsets[:-1]][ring_ids]
+    area2 = (start[:, 0] - base[:, 0]) * (end[:, 1] - base[:, 1]) - (
+        end[:, 0] - base[:, 0]
+    ) * (start[:, 1] - base[:, 1])
+    area2 = ring_sign[ring_ids] * area2
+    centre3 = base + start + end
+
+    area_sum = _sequential_sums(area2, edge_segments, n_segments)
+    centroid_x = _sequential_sums(area2 * centre3[:, 0], edge_segments, n_segments)
+    centroid_y = _sequential_sums(area2 * centre3[:, 1], edge_segments, n_segments)
+    return np.column_stack((centroid_x / 3 / area_sum, centroid_y / 3 / area_sum))
+
+
+def _segment_ids(offsets: npt.NDArray[np.intp]) -> npt.NDArray[np.intp]:
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def _gather_rings(
+    ring_offsets: npt.NDArray[np.intp],
+    order: npt.NDArray[np.intp],
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+    lengths = np.diff(ring_offsets)[order]
+    new_offsets = np.zeros(len(order) + 1, dtype=np.intp)
+    np.cumsum(lengths, out=new_offsets[1:])
+    positions = np.arange(new_offsets[-1]) + np.repeat(
+        ring_offsets[:-1][order] - new_offsets[:-1],
+        lengths,
+    )
+    return positions, new_offsets
+
+
+def build_hex_topology(
+    state_rings: Iterable[tuple[StatePo, Sequence[npt.ArrayLike]]],
+) -> HexTopology:
+    states = []
+    rings = []
+    hexagons_per_state = []
+    for state, state_hexagons in state_rings:
+        states.append(state)
+        hexagons_per_state.append(len(state_hexagons))
+        rings.extend(np.asarray(ring, dtype=np.float64) for ring in state_hexagons)
+
+    state_offsets = np.zeros(len(states) + 1, dtype=np.intp)
+    np.cumsum(hexagons_per_state, out=state_offsets[1:])
+    ring_offsets = np.zeros(len(rings) + 1, dtype=np.intp)
+    np.cumsum([len(ring) for ring in rings], out=ring_offsets[1:])
+    coords = np.concatenate(rings)
+    hexagon_state = _segment_ids(state_offsets)
+
+    # The representative point of a state is the centroid of its hexagon
+    # closest to the centroid of the whole state.
+    hexagon_centroids = _fan_centroids(
+        coords,
+        ring_offsets,
+        np.arange(len(rings)),
+        len(rings),
+    )
+    state_centres = _fan_centroids(coords, ring_offsets, hexagon_state, len(states))
+    offsets = hexagon_centroids - state_centres[hexagon_state]
+    distances = np.sqrt(offsets[:, 0] * offsets[:, 0] + offsets[:, 1] * offsets[:, 1])
+    closest = np.array(
+        [
+            start + np.argmin(distances[start:end])
+            for start, end in pairwise(state_offsets)
+        ],
+        dtype=np.intp,
+    )
+    centroids = hexagon_centroids[closest]
+
+    vertices, vertex_ids = np.unique(
+        np.round(coords, COORDINATE_DECIMALS),
+        axis=0,
+        return_inverse=True,
+    )
+    vertex_ids = vertex_ids.reshape(-1)
+
+    # Consistent hexagon order within each state: top to bottom, then left to
+    # right, by the top left vertex of each hexagon.
+    point_hexagon = _segment_ids(ring_offsets)
+    by_top_left = np.lexsort(
+        (vertices[vertex_ids, 0], -vertices[vertex_ids, 1], point_hexagon),
+    )
+    top_left = vertices[vertex_ids[by_top_left[ring_offsets[:-1]]]]
+    hexagon_order = np.lexsort((top_left[:, 0], -top_left[:, 1], hexagon_state))
+    positions, ring_offsets = _gather_rings(ring_offsets, hexagon_order)
+    ring_vertices = vertex_ids[positions]
+
+    # Edges as (lower, higher) vertex index pairs, tagged with their state
+    is_edge = np.ones(len(ring_vertices) - 1, dtype=bool)
+    is_edge[ring_offsets[1:-1] - 1] = False
+    starts = ring_vertices[:-1][is_edge]
+    ends = ring_vertices[1:][is_edge]
+    edge_state = _segment_ids(ring_offsets)[:-1][is_edge]
+    edge_state = hexagon_state[hexagon_order][edge_state]
+    lower = np.minimum(starts, ends).astype(np.int64)
+    higher = np.maximum(starts, ends).astype(np.int64)
+
+    # An edge used once within a state is on the outside of that state, and
+    # an outside edge shared by two states is a border between them.
+    n_vertices = len(vertices)
+    edge_keys = lower * n_vertices + higher
+    state_edges, counts = np.unique(
+        edge_state * n_vertices**2 + edge_keys,
+        return_counts=True,
+    )
+    exterior_edges = state_edges[counts == 1] % n_vertices**2
+    edges, counts = np.unique(exterior_edges, return_counts=True)
+    border_edges = edges[counts > 1]
+    border_edges = np.column_stack(
+        (border_edges // n_vertices, border_edges % n_vertices),
+    ).astype(np.intp)
+
+    return HexTopology(
+        vertices,
+        ring_vertices.astype(np.intp),
+        ring_offsets,
+        tuple(states),
+        state_offsets,
+        centroids,
+        border_edges,
+    )
@@ -0,0 +1,382 @@
+import csv
+import warnings
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+import numpy.typing as npt
+
+from proportional_ec.constants import STATE_PO
+from proportional_ec.typing import StatePo, Vote, Year
+
+ValidationMode = Literal["strict", "lenient"]
+
+COLUMNS = (
+    "year",
+    "state",
+    "state_po",
+    "state_fips",
+    "state_cen",
+    "state_ic",
+    "office",
+    "candidate",
+    "party_detailed",
+    "writein",
+    "candidatevotes",
+    "totalvotes",
+    "version",
+    "notes",
+    "party_simplified",
+)
+NUMERIC_COLUMNS = ("year", "candidatevotes", "totalvotes")
+USED_COLUMNS = (
+    "year",
+    "state",
+    "state_po",
+    "candidate",
+    "party_detailed",
+    "writein",
+    "candidatevotes",
+    "totalvotes",
+)
+MAX_REPORTED = 20
+
+
+@dataclass
+class VotesTable:
+    # One entry per data row of a votes file
+    line: npt.NDArray[np.int64]
+    columns: dict[str, npt.NDArray[np.str_]]
+    # Number of fields found on each row, before padding to COLUMNS
+    width: npt.NDArray[np.int64]
+    _numeric: dict[str, tuple] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.line)
+
+    def numeric(
+        self,
+        column: str,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.bool_]]:
+        if column not in self._numeric:
+            values = self.columns[column]
+            valid = np.char.isdecimal(values)
+            numbers = np.fromiter(
+                map(int, np.where(valid, values, "0").tolist()),
+                np.int64,
+                len(values),
+            )
+            self._numeric[column] = numbers, valid
+        return self._numeric[column]
+
+    def candidates(self) -> npt.NDArray[np.str_]:
+        # Fall back to the party for blank candidates, then to the write in
+        # status. Rows with none of these resolve to "".
+        candidate = self.columns["candidate"]
+        candidate = np.where(candidate == "", self.columns["party_detailed"], candidate)
+        writein = self.columns["writein"]
+        candidate = np.where(
+            (candidate == "") & (writein == "TRUE"),
+            "write in",
+            candidate,
+        )
+        return np.where((candidate == "") & (writein == "NA"), "unknown", candidate)
+
+
+def read_votes_table(path: Path) -> VotesTable:
+    lines = []
+    widths = []
+    rows = []
+    with path.open() as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            lines.append(reader.line_num)
+            widths.append(len(row))
+            # Rows of the wrong width are reported by validate_votes, pad or
+            # cut them so the columns stay aligned
+            rows.append((row + [""] * len(COLUMNS))[: len(COLUMNS)])
+
+    columns = dict(zip(COLUMNS, zip(*rows, strict=True), strict=True)) if rows else {}
+    return VotesTable(
+        np.array(lines, dtype=np.int64),
+        {name: np.array(columns.get(name, ()), dtype=np.str_) for name in USED_COLUMNS},
+        np.array(widths, dtype=np.int64),
+    )
+
+
+@dataclass
+class Violation:
+    check: str
+    line: int
+    message: str
+    severity: Literal["error", "warning"] = "error"
+
+    def __str__(self) -> str:
+        return f"line {self.line}: [{self.check}] {self.message}"
+
+
+@dataclass
+class ValidationReport:
+    rows: int
+    violations: list[Violation] = field(default_factory=list)
+    # Rows which cannot be loaded at all, skipped in lenient mode
+    unusable: npt.NDArray[np.bool_] | None = None
+
+    @property
+    def errors(self) -> list[Violation]:
+        return [v for v in self.violations if v.severity == "error"]
+
+    @property
+    def warnings(self) -> list[Violation]:
+        return [v for v in self.violations if v.severity == "warning"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def counts(self) -> Counter:
+        return Counter(violation.check for violation in self.violations)
+
+    def __str__(self) -> str:
+        summary = (
+            f"{len(self.errors)} errors and {len(self.warnings)} warnings "
+            f"in {self.rows} rows"
+        )
+        if self.violations:
+            counts = ", ".join(f"{k}: {v}" for k, v in self.counts().items())
+            summary += f" ({counts})"
+        shown = sorted(self.violations, key=lambda v: (v.severity != "error", v.line))
+        lines = [summary, *map(str, shown[:MAX_REPORTED])]
+        if len(shown) > MAX_REPORTED:
+            lines.append(f"... and {len(shown) - MAX_REPORTED} more")
+        return "\n".join(lines)
+
+    def enforce(self, mode: ValidationMode) -> None:
+        if self.ok:
+            return
+        if mode == "strict":
+            raise DataValidationError(self)
+        warnings.warn(str(self), stacklevel=3)
+
+
+class DataValidationError(ValueError):
+    def __init__(self, report: ValidationReport) -> None:
+        super().__init__(str(report))
+        self.report = report
+
+
+def _add(
+    report: ValidationReport,
+    check: str,
+    lines: npt.NDArray[np.int64],
+    messages: list[str] | str,
+    severity: Literal["error", "warning"] = "error",
+) -> None:
+    if isinstance(messages, str):
+        messages = [messages] * len(lines)
+    report.violations.extend(
+        Violation(check, line, message, severity)
+        for line, message in zip(lines.tolist(), messages, strict=True)
+    )
+
+
+def factorize(values: npt.NDArray[np.str_]) -> tuple[list[str], npt.NDArray[np.intp]]:
+    # Hashing beats sorting the strings as np.unique would
+    values = values.tolist()
+    uniques = list(dict.fromkeys(values))
+    index = {value: i for i, value in enumerate(uniques)}
+    return uniques, np.fromiter(map(index.__getitem__, values), np.intp, len(values))
+
+
+def validate_votes(
+    table: VotesTable,
+    year_ec_votes: dict[Year, dict[StatePo, Vote]] | None = None,
+) -> ValidationReport:
+    report = ValidationReport(len(table))
+    line = table.line
+
+    # The fields of these rows are unreliable, so no other check runs on them
+    malformed = table.width != len(COLUMNS)
+    _add(
+        report,
+        "column_count",
+        line[malformed],
+        [
+            f"expected {len(COLUMNS)} columns, found {width}"
+            for width in table.width[malformed].tolist()
+        ],
+    )
+    unusable = malformed.copy()
+
+    numbers = {}
+    for column in NUMERIC_COLUMNS:
+        numbers[column], valid = table.numeric(column)
+        invalid = ~valid & ~malformed
+        _add(
+            report,
+            "invalid_number",
+            line[invalid],
+            [
+                f"{column} is {value!r}"
+                for value in table.columns[column][invalid].tolist()
+            ],
+        )
+        unusable |= invalid
+    year, votes, total = (numbers[column] for column in NUMERIC_COLUMNS)
+
+    candidate = table.candidates()
+    missing = (candidate == "") & ~malformed
+    _add(
+        report,
+        "missing_candidate",
+        line[missing],
+        [
+            f"no candidate, party or write in status (writein={value!r})"
+            for value in table.columns["writein"][missing].tolist()
+        ],
+    )
+    unusable |= missing
+
+    po = table.columns["state_po"]
+    states, state_code = factorize(po)
+    names, name_code = factorize(table.columns["state"])
+    known_po = np.array([state in STATE_PO.values() for state in states], dtype=bool)
+    name_po = np.array(
+        [STATE_PO.get(name.lower(), "") for name in names],
+        dtype=np.str_,
+    )
+    unknown = (~known_po[state_code] | (name_po[name_code] != po)) & ~malformed
+    _add(
+        report,
+        "unknown_state",
+        line[unknown],
+        [
+            f"state {name!r} with code {code!r}"
+            for name, code in zip(
+                table.columns["state"][unknown].tolist(),
+                po[unknown].tolist(),
+                strict=True,
+            )
+        ],
+    )
+    unusable |= unknown
+
+    # Group the loadable rows by (year, state) for the total checks
+    usable = ~unusable
+    groups, group = np.unique(
+        year[usable] * len(states) + state_code[usable],
+        return_inverse=True,
+    )
+    group_year, group_state = np.divmod(groups, len(states))
+    group_line = line[usable]
+    group_total = total[usable]
+
+    first_row = np.full(len(groups), len(group), dtype=np.int64)
+    np.minimum.at(first_row, group, np.arange(len(group)))
+    expected_total = group_total[first_row]
+    inconsistent = group_total != expected_total[group]
+    _add(
+        report,
+        "inconsistent_total",
+        group_line[inconsistent],
+        [
+            f"totalvotes {value} differs from {expected} on line {first}"
+            for value, expected, first in zip(
+                group_total[inconsistent].tolist(),
+                expected_total[group[inconsistent]].tolist(),
+                group_line[first_row[group[inconsistent]]].tolist(),
+                strict=True,
+            )
+        ],
+    )
+
+    vote_sums = np.zeros(len(groups), dtype=np.int64)
+    np.add.at(vote_sums, group, votes[usable])
+    mismatched = vote_sums != expected_total
+    _add(
+        report,
+        "total_mismatch",
+        group_line[first_row[mismatched]],
+        [
+            f"{states[state]} {election} candidate votes sum to {vote_sum}, "
+            f"not {expected}"
+            for election, state, vote_sum, expected in zip(
+                group_year[mismatched].tolist(),
+                group_state[mismatched].tolist(),
+                vote_sums[mismatched].tolist(),
+                expected_total[mismatched].tolist(),
+                strict=True,
+            )
+        ],
+    )
+
+    # The same candidate on several party lines of one state is merged by
+    # the loader, which is expected for fusion tickets but worth surfacing.
+    candidates, candidate_code = factorize(candidate[usable])
+    parties, party_code = factorize(table.columns["party_detailed"][usable])
+    pairs, pair = np.unique(
+        group * len(candidates) + candidate_code,
+        return_inverse=True,
+    )
+    party_lines = np.unique(pair * len(parties) + party_code) // len(parties)
+    party_count = np.bincount(party_lines, minlength=len(pairs))[pair]
+    fusion = party_count > 1
+    _add(
+        report,
+        "duplicate_candidate",
+        group_line[fusion],
+        [
+            f"{candidates[name]} is on {count} party lines in "
+            f"{states[group_state[row_group]]} {group_year[row_group]} "
+            f"({parties[party]})"
+            for name, count, row_group, party in zip(
+                candidate_code[fusion].tolist(),
+                party_count[fusion].tolist(),
+                group[fusion].tolist(),
+                party_code[fusion].tolist(),
+                strict=True,
+            )
+        ],
+        severity="warning",
+    )
+
+    if year_ec_votes is not None:
+        uncovered = ~np.array(
+            [
+                states[state] in year_ec_votes.get(election, {})
+                for election, state in zip(
+                    group_year.tolist(),
+                    group_state.tolist(),
+                    strict=True,
+                )
+            ],
+            dtype=bool,
+        )
+        _add(
+            report,
+            "missing_electoral_votes",
+            group_line[first_row[uncovered]],
+            [
+                f"no electoral votes for {states[state]} in {election}"
+                for election, state in zip(
+                    group_year[uncovered].tolist(),
+                    group_state[uncovered].tolist(),
+                    strict=True,
+                )
+            ],
+        )
+        # Without electoral votes the state cannot be apportioned
+        unusable[np.flatnonzero(usable)[uncovered[group]]] = True
+
+    report.unusable = unusable
+    return report
+
+
+def validate_votes_file(
+    path: Path,
+    year_ec_votes: dict[Year, dict[StatePo, Vote]] | None = None,
+) -> ValidationReport:
+    return validate_votes(read_votes_table(path), year_ec_votes)
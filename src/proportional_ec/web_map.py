@@ -0,0 +1,241 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import folium
+import numpy as np
+from branca.element import MacroElement
+from jinja2 import Template
+
+from proportional_ec.draw import map_candidate_order
+from proportional_ec.identity import CandidateLabel
+from proportional_ec.summarise import aggregate_election_results
+from proportional_ec.topology import COORDINATE_DECIMALS, HexTopology
+from proportional_ec.typing import Candidate, Seats, StatePo, Year
+
+# Vertices are rounded to COORDINATE_DECIMALS, so they are sent as integers
+COORDINATE_SCALE = 10**COORDINATE_DECIMALS
+
+
+def _to_ints(values: np.ndarray) -> list[int]:
+    return np.rint(values * COORDINATE_SCALE).astype(np.int64).ravel().tolist()
+
+
+def _year_payload(
+    topology: HexTopology,
+    state_seats: dict[StatePo, dict[Candidate, Seats]],
+    candidate_labels: dict[Candidate, CandidateLabel],
+) -> dict[str, Any]:
+    overall_results = aggregate_election_results(state_seats)
+    legend_order = sorted(
+        overall_results,
+        key=lambda x: overall_results[x],
+        reverse=True,
+    )
+    candidate_index = {candidate: i for i, candidate in enumerate(legend_order)}
+
+    # Hexagons of each state are filled in the same order as the static map
+    map_order = map_candidate_order(overall_results)
+    hexagon_candidates = []
+    state_break_down = []
+    for state in topology.states:
+        seats = state_seats.get(state, {})
+        hexagon_candidates.extend(
+            candidate_index[candidate]
+            for candidate in map_order
+            if candidate in seats
+            for _ in range(seats[candidate])
+        )
+        state_break_down.append(
+            [
+                [candidate_index[candidate], seats[candidate]]
+                for candidate in legend_order
+                if candidate in seats
+            ],
+        )
+
+    if len(hexagon_candidates) != topology.state_offsets[-1]:
+        msg = "Incorrect number of seats allocated."
+        raise ValueError(msg)
+
+    return {
+        "vertices": _to_ints(topology.vertices),
+        "rings": topology.ring_vertices.tolist(),
+        "ringOffsets": topology.ring_offsets.tolist(),
+        "states": list(topology.states),
+        "stateOffsets": topology.state_offsets.tolist(),
+        "centroids": _to_ints(topology.centroids),
+        "borders": topology.border_edges.ravel().tolist(),
+        "candidates": [
+            [
+                candidate_labels[candidate].name,
+                candidate_labels[candidate].colour,
+                overall_results[candidate],
+            ]
+            for candidate in legend_order
+        ],
+        "hexagons": hexagon_candidates,
+        "breakDown": state_break_down,
+    }
+
+
+def web_map_payload(
+    year_topology: dict[Year, HexTopology],
+    year_state_seats: dict[Year, dict[StatePo, dict[Candidate, Seats]]],
+    year_candidate_labels: dict[Year, dict[Candidate, CandidateLabel]],
+) -> dict[str, Any]:
+    years = sorted(year_state_seats)
+    return {
+        "scale": COORDINATE_SCALE,
+        "years": years,
+        "data": {
+            str(year): _year_payload(
+                year_topology[year],
+                year_state_seats[year],
+                year_candidate_labels[year],
+            )
+            for year in years
+        },
+    }
+
+
+class YearSelector(MacroElement):
+    # All styling happens in the browser from the shared payload, switching
+    # year only rebuilds the vector layer.
+    _template = Template(
+        """
+        {% macro header(this, kwargs) %}
+        <style>
+            .pec-label {
+                color: white;
+                font: bold 12px sans-serif;
+                text-align: center;
+                text-shadow: 0 0 3px black, 0 0 3px black;
+            }
+            .pec-control {
+                background: white;
+                padding: 6px 8px;
+                border-radius: 4px;
+                font: 14px sans-serif;
+            }
+            .pec-swatch { opacity: 0.5; }
+        </style>
+        {% endmacro %}
+
+        {% macro script(this, kwargs) %}
+        (function() {
+            const map = {{ this._parent.get_name() }};
+            const payload = {{ this.payload }};
+            const layer = L.featureGroup().addTo(map);
+
+            function point(values, i) {
+                return [
+                    values[2 * i + 1] / payload.scale,
+                    values[2 * i] / payload.scale,
+                ];
+            }
+            // Names come from user supplied vote files
+            function escape(text) {
+                return String(text).replace(/[&<>"']/g, (c) => "&#" + c.charCodeAt(0) + ";");
+            }
+            function swatch(colour) {
+                return '<span class="pec-swatch" style="color:' + escape(colour) + '">&#9632;</span> ';
+            }
+
+            const legend = L.control({position: "bottomleft"});
+            legend.onAdd = function() {
+                this._div = L.DomUtil.create("div", "pec-control");
+                return this._div;
+            };
+            legend.addTo(map);
+
+            function draw(year) {
+                const d = payload.data[year];
+                layer.clearLayers();
+
+                for (let s = 0; s < d.states.length; s++) {
+                    const popup = "<b>" + escape(d.states[s]) + "</b><br>" + d.breakDown[s].map(
+                        ([c, seats]) => swatch(d.candidates[c][1]) + escape(d.candidates[c][0]) + ": " + seats
+                    ).join("<br>");
+                    for (let h = d.stateOffsets[s]; h < d.stateOffsets[s + 1]; h++) {
+                        const ring = [];
+                        for (let j = d.ringOffsets[h]; j < d.ringOffsets[h + 1]; j++) {
+                            ring.push(point(d.vertices, d.rings[j]));
+                        }
+                        L.polygon(ring, {
+                            color: "lightgrey",
+                            weight: 1,
+                            fillColor: d.candidates[d.hexagons[h]][1],
+                            fillOpacity: 0.5,
+                        }).bindPopup(popup).addTo(layer);
+                    }
+                    L.marker(point(d.centroids, s), {
+                        icon: L.divIcon({className: "pec-label", html: escape(d.states[s]), iconSize: [30, 14]}),
+                        interactive: false,
+                    }).addTo(layer);
+                }
+
+                const borders = [];
+                for (let i = 0; i < d.borders.length; i += 2) {
+                    borders.push([point(d.vertices, d.borders[i]), point(d.vertices, d.borders[i + 1])]);
+                }
+                L.polyline(borders, {color: "black", weight: 2, interactive: false}).addTo(layer);
+
+                legend._div.innerHTML = "<b>" + escape(year) + " Election Results</b><br>" + d.candidates.map(
+                    ([name, colour, seats]) => swatch(colour) + escape(name) + " (" + seats + " EV" + (seats !== 1 ? "s" : "") + ")"
+                ).join("<br>");
+            }
+
+            const selector = L.control({position: "topright"});
+            selector.onAdd = function() {
+                const div = L.DomUtil.create("div", "pec-control");
+                const select = L.DomUtil.create("select", "", div);
+                for (const year of payload.years) {
+                    select.add(new Option(year, year));
+                }
+                select.value = payload.years[payload.years.length - 1];
+                L.DomEvent.disableClickPropagation(div);
+                L.DomEvent.on(select, "change", () => draw(select.value));
+                return div;
+            };
+            selector.addTo(map);
+
+            draw(payload.years[payload.years.length - 1]);
+            map.fitBounds(layer.getBounds());
+        })();
+        {% endmacro %}
+        """,
+    )
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        super().__init__()
+        self._name = "YearSelector"
+        # Escaped so that no string in the data can close the script element
+        self.payload = (
+            json.dumps(payload, separators=(",", ":"))
+            .replace("<", "\\u003c")
+            .replace(">", "\\u003e")
+            .replace("&", "\\u0026")
+        )
+
+
+def export_web_map(
+    out_path: str | Path,
+    year_topology: dict[Year, HexTopology],
+    year_state_seats: dict[Year, dict[StatePo, dict[Candidate, Seats]]],
+    year_candidate_labels: dict[Year, dict[Candidate, CandidateLabel]],
+) -> None:
+    web_map = folium.Map(
+        location=[0, 0],
+        zoom_start=0,
+        crs="Simple",
+        tiles=None,
+        prefer_canvas=True,
+        min_zoom=-2,
+    )
+    web_map.add_child(
+        YearSelector(
+            web_map_payload(year_topology, year_state_seats, year_candidate_labels),
+        ),
+    )
+    web_map.save(str(out_path))
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from proportional_ec.bootstrap import BLOCK_SIZE, bootstrap_election
+from proportional_ec.election_method import hare_quota_seats
+
+STATE_COUNTS = {
+    "AL": {"A": 500, "B": 480, "C": 20},
+    "AK": {"A": 100, "B": 120},
+    "AZ": {"A": 1000, "B": 990, "C": 40},
+    "AR": {"A": 300, "B": 310, "C": 5},
+}
+STATE_EC_VOTES = {"AL": 9, "AK": 3, "AZ": 11, "AR": 6, "CA": 55}
+
+
+@pytest.mark.parametrize("tie_policy", ["error", "lot"])
+def test_bootstrap_independent_of_processes(tie_policy):
+    # Three blocks, the last one partial
+    replicates = 2 * BLOCK_SIZE + 10
+    serial, parallel = (
+        bootstrap_election(
+            STATE_COUNTS,
+            STATE_EC_VOTES,
+            replicates=replicates,
+            seed=7,
+            processes=processes,
+            tie_policy=tie_policy,
+        )
+        for processes in (1, 3)
+    )
+    assert len(serial.replicates) + serial.undefined == replicates
+    np.testing.assert_array_equal(serial.replicates, parallel.replicates)
+    np.testing.assert_array_equal(serial.lower, parallel.lower)
+    np.testing.assert_array_equal(serial.upper, parallel.upper)
+    assert serial.winner_change_probability == parallel.winner_change_probability
+    assert (serial.undefined, serial.ties) == (parallel.undefined, parallel.ties)
+
+
+def test_bootstrap_result():
+    result = bootstrap_election(
+        STATE_COUNTS,
+        STATE_EC_VOTES,
+        replicates=300,
+        quota_seats=hare_quota_seats,
+    )
+    assert result.candidates == ["A", "B", "C"]
+    assert result.ec_votes.sum() == 29
+    assert (result.replicates.sum(axis=1) == 29).all()
+    assert (result.lower <= result.ec_votes).all()
+    assert (result.ec_votes <= result.upper).all()
+    assert result.winner == "A"
+    assert 0 < result.winner_change_probability < 1
+
+
+def test_bootstrap_rejects_enumerate():
+    with pytest.raises(ValueError, match="enumerate"):
+        bootstrap_election(STATE_COUNTS, STATE_EC_VOTES, tie_policy="enumerate")
@@ -0,0 +1,96 @@
+import json
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from proportional_ec import cli
+from proportional_ec.cli import ScenarioJob, compute_results, load_jobs, main
+from proportional_ec.election_method import (
+    TIE_MESSAGES,
+    TieBreaker,
+    run_hare_quota_largest_remainder,
+)
+from proportional_ec.store import ResultStore
+
+DATA_DIR = Path(__file__).parents[1] / "data"
+VOTES = DATA_DIR / "state_votes" / "1976-2020-president.csv"
+
+
+def write_scenario(path, year, replace=("", "")):
+    lines = VOTES.read_text().splitlines(keepends=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        lines[0]
+        + "".join(
+            line.replace(*replace) for line in lines[1:] if line.startswith(f"{year},")
+        ),
+    )
+    return path
+
+
+def test_compute_only(tmp_path):
+    argv = ["-c", "-q", "-y", "2016-2020", "-o", str(tmp_path)]
+    assert main([*argv, "--data-dir", str(DATA_DIR)]) == 0
+    records = json.loads((tmp_path / "results.json").read_text())
+    assert [record["year"] for record in records] == [2016, 2020]
+
+
+def test_duplicate_scenario_names(tmp_path):
+    paths = [
+        write_scenario(tmp_path / directory / "scenario.csv", 2020)
+        for directory in ("a", "b")
+    ]
+    with pytest.raises(ValueError, match="both named 'scenario'"):
+        load_jobs(DATA_DIR, paths, None)
+
+
+def test_errors_are_reported_without_traceback(tmp_path, capsys):
+    path = write_scenario(
+        tmp_path / "new_party.csv",
+        1976,
+        ('"DEMOCRAT",FALSE', '"NEW PARTY",FALSE'),
+    )
+    argv = ["-q", "-s", str(path), "-f", "html", "-o", str(tmp_path)]
+    with pytest.raises(SystemExit) as exit_info:
+        main([*argv, "--data-dir", str(DATA_DIR)])
+    assert exit_info.value.code == 2
+    assert "No colour for the NEW PARTY party" in capsys.readouterr().err
+
+
+def test_cached_results_keep_their_ties():
+    method = partial(run_hare_quota_largest_remainder, tie_breaker=TieBreaker("votes"))
+    with ResultStore() as store:
+        for _ in range(2):
+            jobs = [
+                ScenarioJob(
+                    scenario,
+                    2020,
+                    {"AL": {"B": 2, "A": 7, "C": 11}},
+                    {"AL": 4},
+                    {},
+                )
+                for scenario in ("a", "b")
+            ]
+            assert compute_results(jobs, method, store=store) == {"remainder": 2}
+        assert (store.hits, store.misses) == (2, 2)
+
+
+@pytest.mark.parametrize(
+    ("message", "hint"),
+    [
+        (TIE_MESSAGES["remainder"], True),
+        ("Invalid number of seats allocated.", False),
+    ],
+)
+def test_tie_policy_hint_only_for_ties(monkeypatch, capsys, tmp_path, message, hint):
+    def compute_results(*_):
+        raise RuntimeError(message)
+
+    monkeypatch.setattr(cli, "compute_results", compute_results)
+    argv = ["-c", "-q", "-y", "2020", "-o", str(tmp_path)]
+    with pytest.raises(SystemExit):
+        main([*argv, "--data-dir", str(DATA_DIR)])
+    err = capsys.readouterr().err
+    assert message in err
+    assert ("--tie-policy" in err) == hint
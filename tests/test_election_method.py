@@ -0,0 +1,196 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from proportional_ec.bootstrap import _vote_matrix
+from proportional_ec.data import load_electoral_college_per_year, load_votes
+from proportional_ec.election_method import (
+    TieBreaker,
+    batched_droop_quota_largest_remainder,
+    batched_hare_quota_largest_remainder,
+    droop_quota,
+    droop_quota_seats,
+    hare_quota,
+    hare_quota_seats,
+    largest_remainder_outcomes,
+    run_largest_remainder_election,
+)
+
+DATA_DIR = Path(__file__).parents[1] / "data"
+QUOTAS = {
+    "droop": (droop_quota, droop_quota_seats, batched_droop_quota_largest_remainder),
+    "hare": (hare_quota, hare_quota_seats, batched_hare_quota_largest_remainder),
+}
+
+
+def scalar_seats(votes, available_seats, quota):
+    # Seats from run_largest_remainder_election, None where it raises
+    candidate_votes = dict(enumerate(votes.tolist()))
+    try:
+        candidate_seats = run_largest_remainder_election(
+            candidate_votes,
+            available_seats,
+            quota(sum(candidate_votes.values()), available_seats),
+        )
+    except RuntimeError:
+        return None
+    return list(candidate_seats.values())
+
+
+@pytest.mark.parametrize("method", QUOTAS)
+@pytest.mark.parametrize("n_candidates", [1, 2, 3, 5])
+def test_batched_matches_scalar_on_random_elections(method, n_candidates):
+    # Small vote counts, so ties and over allocation come up often
+    quota, quota_seats, _ = QUOTAS[method]
+    rng = np.random.default_rng(n_candidates)
+    votes = rng.integers(0, 12, size=(2000, n_candidates))
+    votes[:, 0] += 1
+    available_seats = rng.integers(1, 10, size=len(votes))
+
+    seats, over_allocated, tied = largest_remainder_outcomes(
+        votes,
+        available_seats,
+        quota_seats(available_seats),
+    )
+    undefined = over_allocated | tied
+    assert undefined.any() or n_candidates == 1
+    assert (seats.sum(axis=1) == available_seats).all()
+    for i in range(len(votes)):
+        expected = scalar_seats(votes[i], int(available_seats[i]), quota)
+        if expected is None:
+            assert undefined[i]
+        else:
+            assert not undefined[i]
+            assert seats[i].tolist() == expected
+
+
+@pytest.mark.parametrize("method", QUOTAS)
+def test_batched_matches_scalar_on_elections(method):
+    quota, _, batched = QUOTAS[method]
+    year_ec_votes = load_electoral_college_per_year(
+        DATA_DIR / "electoral_college" / "electoral_college.csv",
+    )
+    year_state_votes, _ = load_votes(
+        DATA_DIR / "state_votes" / "1976-2020-president.csv",
+    )
+    for year, state_votes in year_state_votes.items():
+        candidates, votes, seats = _vote_matrix(state_votes, year_ec_votes[year])
+        batched_seats = batched(votes, seats)
+        for state, state_seats in zip(state_votes, batched_seats, strict=True):
+            candidate_votes = state_votes[state]
+            available_seats = year_ec_votes[year][state]
+            expected = run_largest_remainder_election(
+                candidate_votes,
+                available_seats,
+                quota(sum(candidate_votes.values()), available_seats),
+            )
+            assert {
+                candidate: seats
+                for candidate, seats in zip(
+                    candidates,
+                    state_seats.tolist(),
+                    strict=True,
+                )
+                if candidate in candidate_votes
+            } == expected
+
+
+# Hare quota of 5, A and B tie on a remainder of 0.4 for the last seat
+REMAINDER_TIE = ({"B": 2, "A": 7, "C": 11}, 4)
+# Droop quota of 10 gives three whole seats for two
+OVER_ALLOCATION = ({"A": 10, "B": 20}, 2)
+
+
+def hare(candidate_votes, available_seats, tie_breaker=None):
+    return run_largest_remainder_election(
+        candidate_votes,
+        available_seats,
+        hare_quota(sum(candidate_votes.values()), available_seats),
+        tie_breaker,
+    )
+
+
+def droop(candidate_votes, available_seats, tie_breaker=None):
+    return run_largest_remainder_election(
+        candidate_votes,
+        available_seats,
+        droop_quota(sum(candidate_votes.values()), available_seats),
+        tie_breaker,
+    )
+
+
+@pytest.mark.parametrize(
+    ("method", "election"),
+    [(hare, REMAINDER_TIE), (droop, OVER_ALLOCATION)],
+)
+def test_ties_raise_by_default(method, election):
+    with pytest.raises(RuntimeError):
+        method(*election)
+    with pytest.raises(RuntimeError):
+        method(*election, TieBreaker("error"))
+
+
+def test_unknown_tie_policy():
+    with pytest.raises(ValueError, match="coin"):
+        TieBreaker("coin")
+
+
+def test_votes_policy():
+    tie_breaker = TieBreaker("votes")
+    assert hare(*REMAINDER_TIE, tie_breaker) == {"B": 0, "A": 2, "C": 2}
+    assert droop(*OVER_ALLOCATION, tie_breaker) == {"A": 0, "B": 2}
+    assert droop(*OVER_ALLOCATION, tie_breaker) == {"A": 0, "B": 2}
+    assert tie_breaker.counts == {"remainder": 1, "over_allocation": 2}
+    assert not tie_breaker.enumerated
+
+
+def test_lot_policy_is_seeded_by_the_election():
+    outcomes = set()
+    for seed in range(20):
+        first = TieBreaker("lot", seed)
+        second = TieBreaker("lot", seed)
+        # Other elections drawn first do not change the lot
+        droop(*OVER_ALLOCATION, second)
+        candidate_seats = hare(*REMAINDER_TIE, first)
+        assert hare(*REMAINDER_TIE, second) == candidate_seats
+        assert sum(candidate_seats.values()) == REMAINDER_TIE[1]
+        outcomes.add(tuple(candidate_seats.items()))
+    assert outcomes == {
+        (("B", 0), ("A", 2), ("C", 2)),
+        (("B", 1), ("A", 1), ("C", 2)),
+    }
+
+
+def test_enumerate_policy():
+    tie_breaker = TieBreaker("enumerate")
+    assert hare(*REMAINDER_TIE, tie_breaker) == {"B": 0, "A": 2, "C": 2}
+    assert droop(*OVER_ALLOCATION, tie_breaker) == {"A": 0, "B": 2}
+    remainder, over_allocation = tie_breaker.enumerated
+    assert remainder.candidate_votes == REMAINDER_TIE[0]
+    assert remainder.outcomes == [
+        {"B": 0, "A": 2, "C": 2},
+        {"B": 1, "A": 1, "C": 2},
+    ]
+    assert over_allocation.available_seats == 2
+    assert over_allocation.outcomes == [{"A": 0, "B": 2}, {"A": 1, "B": 1}]
+    assert tie_breaker.counts == {"remainder": 1, "over_allocation": 1}
+
+
+def test_batched_tie_does_not_abort_other_states():
+    votes = np.array([[2, 7, 11], [50, 30, 20], [10, 20, 0]])
+    available_seats = np.array([4, 10, 2])
+    with pytest.raises(RuntimeError):
+        batched_hare_quota_largest_remainder(votes, available_seats)
+
+    tie_breaker = TieBreaker("votes")
+    seats = batched_hare_quota_largest_remainder(votes, available_seats, tie_breaker)
+    assert seats.tolist() == [[0, 2, 2], [5, 3, 2], [1, 1, 0]]
+    assert tie_breaker.counts == {"remainder": 1}
+
+    with pytest.raises(ValueError, match="one election at a time"):
+        batched_hare_quota_largest_remainder(
+            votes,
+            available_seats,
+            TieBreaker("enumerate"),
+        )
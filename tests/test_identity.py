@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from proportional_ec.identity import build_candidate_index, normalise_name
+
+ROWS = [
+    (2016, 'HOEFLING, THOMAS CONRAD ""TOM""', "AMERICA'S PARTY", 10),
+    (2016, "HOEFLING, TOM", "AMERICAN INDEPENDENT PARTY", 5),
+    (2016, 'TITTLE, SHEILA ""SAMM""', "WE THE PEOPLE", 3),
+    (2016, "write in", "", 2),
+    (1984, "LAROUCHE, LYNDON, JR.", "INDEPENDENT", 7),
+    (1988, "LAROUCHE, LYNDON JR", "NATIONAL ECONOMIC RECOVERY", 4),
+    (1988, "DANIELS, RON", "INDEPENDENT", 6),
+    (1992, "DANIELS, RONALD", "PEACE AND FREEDOM", 8),
+    (1992, "CLINTON, BILL", "DEMOCRAT", 9),
+]
+
+
+@pytest.fixture
+def index_and_ids():
+    years, candidates, parties, votes = zip(*ROWS, strict=True)
+    return build_candidate_index(
+        np.array(years),
+        np.array(candidates),
+        np.array(parties),
+        np.array(votes),
+    )
+
+
+def test_canonical_names(index_and_ids):
+    index, candidate_ids = index_and_ids
+    assert index.names == [
+        'HOEFLING, THOMAS CONRAD "TOM"',
+        'TITTLE, SHEILA "SAMM"',
+        "write in",
+        "LAROUCHE, LYNDON JR",
+        "DANIELS, RONALD",
+        "CLINTON, BILL",
+    ]
+    assert candidate_ids.tolist() == [0, 0, 1, 2, 3, 3, 4, 4, 5]
+
+
+def test_primary_parties(index_and_ids):
+    index, _ = index_and_ids
+    assert index.nominal_parties(2016) == {
+        'HOEFLING, THOMAS CONRAD "TOM"': "AMERICA'S PARTY",
+        'TITTLE, SHEILA "SAMM"': "WE THE PEOPLE",
+        "write in": "",
+    }
+    assert list(index.nominal_parties(1992)) == ["DANIELS, RONALD", "CLINTON, BILL"]
+
+
+def test_labels(index_and_ids):
+    index, _ = index_and_ids
+    labels = index.labels(1992)
+    clinton = labels["CLINTON, BILL"]
+    assert (clinton.name, clinton.party) == ("Bill Clinton", "DEMOCRAT")
+    assert clinton.colour == "blue"
+    with pytest.raises(KeyError, match="PEACE AND FREEDOM"):
+        _ = labels["DANIELS, RONALD"].colour
+
+
+def test_normalise_name():
+    assert normalise_name('HOEFLING, THOMAS CONRAD ""TOM""') == (
+        'Thomas Conrad "Tom" Hoefling'
+    )
+    assert normalise_name("LAROUCHE, LYNDON, JR.") == "Lyndon Larouche Jr."
+    assert normalise_name("MCMULLIN, EVAN") == "Evan McMullin"
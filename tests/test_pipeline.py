@@ -0,0 +1,80 @@
+import asyncio
+from pathlib import Path
+
+from proportional_ec.data import load_electoral_college_per_year, load_votes
+from proportional_ec.election import run_election
+from proportional_ec.election_method import run_droop_quota_largest_remainder
+from proportional_ec.pipeline import ElectionJob, Stage, election_stages, run_pipeline
+
+DATA_DIR = Path(__file__).parents[1] / "data"
+
+
+def double(x):
+    return 2 * x
+
+
+def test_run_pipeline_results_and_stats():
+    results = []
+    stats = asyncio.run(
+        run_pipeline(
+            range(10),
+            [Stage("double", double), Stage("again", double, skip=lambda x: x > 10)],
+            sink=results.append,
+        ),
+    )
+    assert sorted(results) == sorted(4 * x if x <= 5 else 2 * x for x in range(10))
+
+    double_stats, again_stats = stats
+    assert double_stats.processed == 10
+    assert (again_stats.processed, again_stats.skipped) == (6, 4)
+    for stage_stats in stats:
+        assert stage_stats.queue_depth == 0
+        assert 1 <= stage_stats.max_queue_depth <= 2
+
+
+def test_run_pipeline_empty():
+    reports = []
+    stats = asyncio.run(
+        run_pipeline([], [Stage("double", double)], report=reports.append),
+    )
+    assert stats[0].processed == 0
+    assert stats[0].queue_depth == 0
+    assert stats[0].max_queue_depth == 0
+    assert reports[-1] is stats
+
+
+def test_election_stages_in_processes(tmp_path):
+    # Apportionment and geometry run in a process pool, so the stage
+    # functions and the jobs must pickle
+    year_ec_votes = load_electoral_college_per_year(
+        DATA_DIR / "electoral_college" / "electoral_college.csv",
+    )
+    year_state_votes, index = load_votes(
+        DATA_DIR / "state_votes" / "1976-2020-president.csv",
+    )
+    years = [2016, 2020]
+    jobs = [
+        ElectionJob(
+            year,
+            DATA_DIR / "topo_data" / f"tiles{year}.topo.json",
+            tmp_path / f"{year}.png",
+            year_state_votes[year],
+            year_ec_votes[year],
+            index.labels(year),
+        )
+        for year in years
+    ]
+    stages = election_stages(run_droop_quota_largest_remainder, processes=2)
+    results = []
+    stats = asyncio.run(run_pipeline(jobs, stages[:3], sink=results.append))
+
+    assert sorted(job.year for job in results) == years
+    for job in results:
+        assert job.state_seats == run_election(
+            run_droop_quota_largest_remainder,
+            year_state_votes[job.year],
+            year_ec_votes[job.year],
+        )
+        assert job.topology is not None
+        assert job.topo_rings is None
+    assert [stage_stats.processed for stage_stats in stats] == [2, 2, 2]
@@ -0,0 +1,134 @@
+from functools import partial
+
+import pytest
+
+from proportional_ec.election_method import (
+    TieBreaker,
+    run_droop_quota_largest_remainder,
+    run_hare_quota_largest_remainder,
+)
+from proportional_ec.store import ResultStore, election_input_hash, method_name
+
+COUNTS = {"AL": {"A": 61, "B": 39}, "AK": {"A": 1, "B": 2}}
+EC_VOTES = {"AL": 9, "AK": 3, "AZ": 11}
+
+
+class Method:
+    def __call__(self, candidate_votes, available_seats):
+        return run_droop_quota_largest_remainder(candidate_votes, available_seats)
+
+
+def test_method_name():
+    assert method_name(run_droop_quota_largest_remainder) == (
+        "proportional_ec.election_method.run_droop_quota_largest_remainder"
+    )
+    method = partial(
+        run_hare_quota_largest_remainder,
+        tie_breaker=TieBreaker("lot", 3),
+    )
+    assert method_name(method) == (
+        "proportional_ec.election_method.run_hare_quota_largest_remainder"
+        "(tie_breaker=TieBreaker('lot', seed=3))"
+    )
+
+
+def nested():
+    def method(candidate_votes, available_seats):
+        return run_droop_quota_largest_remainder(candidate_votes, available_seats)
+
+    return method
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        lambda *_: {},
+        nested(),
+        Method(),
+        partial(run_droop_quota_largest_remainder, tie_breaker=object()),
+    ],
+)
+def test_method_name_rejects_unstable_names(method):
+    with pytest.raises(ValueError, match="stable"):
+        method_name(method)
+
+
+def test_election_input_hash():
+    input_hash = election_input_hash(
+        run_droop_quota_largest_remainder,
+        COUNTS,
+        EC_VOTES,
+    )
+    # States without votes do not change the result,
+    assert input_hash == election_input_hash(
+        run_droop_quota_largest_remainder,
+        COUNTS,
+        {"AL": 9, "AK": 3},
+    )
+    assert input_hash != election_input_hash(
+        run_hare_quota_largest_remainder,
+        COUNTS,
+        EC_VOTES,
+    )
+    # but the order of the states does not
+    assert input_hash == election_input_hash(
+        run_droop_quota_largest_remainder,
+        dict(reversed(COUNTS.items())),
+        EC_VOTES,
+    )
+    # Tie policies can depend on the order of the candidates
+    assert input_hash != election_input_hash(
+        run_droop_quota_largest_remainder,
+        {"AL": {"B": 39, "A": 61}, "AK": COUNTS["AK"]},
+        EC_VOTES,
+    )
+
+
+def test_result_store_evicts_least_recently_used():
+    with ResultStore(max_entries=2) as store:
+        for input_hash in ("a", "b"):
+            store.put(
+                input_hash,
+                {"AL": {"A": 1}},
+                year=2020,
+                method="m",
+                scenario=input_hash,
+            )
+        assert store.get("a") == {"AL": {"A": 1}}
+        store.put("c", {}, year=2020, method="m", scenario="c")
+        assert store.get("b") is None
+        assert [result.scenario for result in store.query(year=2020)] == ["a", "c"]
+        stats = store.stats()
+        assert (stats.hits, stats.misses, stats.evictions) == (1, 1, 1)
+        assert stats.entries == 2
+
+
+def test_run_election_memoized():
+    with ResultStore() as store:
+        for scenario in ("baseline", "copy"):
+            state_seats = store.run_election(
+                run_droop_quota_largest_remainder,
+                COUNTS,
+                EC_VOTES,
+                year=2020,
+                scenario=scenario,
+            )
+            assert state_seats == {"AL": {"A": 6, "B": 3}, "AK": {"A": 1, "B": 2}}
+        assert (store.hits, store.misses) == (1, 1)
+        assert [result.scenario for result in store.query(year=2020)] == [
+            "baseline",
+            "copy",
+        ]
+
+
+def test_run_election_keeps_ties():
+    # Hare quota of 5 with A and B tied on their remainders in AL
+    method = partial(run_hare_quota_largest_remainder, tie_breaker=TieBreaker("votes"))
+    counts = {"AL": {"B": 2, "A": 7, "C": 11}}
+    with ResultStore() as store:
+        for scenario in ("baseline", "copy"):
+            store.run_election(method, counts, {"AL": 4}, year=2020, scenario=scenario)
+        assert store.hits == 1
+        assert store.ties(election_input_hash(method, counts, {"AL": 4})) == {
+            "remainder": 1,
+        }
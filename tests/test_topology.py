@@ -0,0 +1,65 @@
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from proportional_ec.draw import load_hex_topology
+
+DATA_DIR = Path(__file__).parents[1] / "data" / "topo_data"
+# Summary of the polygons, centroids and borders the geopandas/shapely
+# implementation produced for each tile file
+EXPECTED = json.loads(
+    (Path(__file__).parent / "data" / "hex_topology.json").read_text(),
+)
+
+
+def _digest(value: object) -> str:
+    return hashlib.sha256(json.dumps(value).encode()).hexdigest()
+
+
+def summarise(
+    state_polygons: dict[str, list],
+    state_centroids: dict[str, tuple[float, float]],
+    border_edges: list,
+) -> dict[str, object]:
+    borders = sorted(
+        sorted([list(map(float, start)), list(map(float, end))])
+        for start, end in border_edges
+    )
+    return {
+        "states": list(state_polygons),
+        "hexagons": [len(polygons) for polygons in state_polygons.values()],
+        "polygons": _digest(
+            [
+                [[list(map(float, point)) for point in polygon] for polygon in polygons]
+                for polygons in state_polygons.values()
+            ],
+        ),
+        "centroids": [list(map(float, state_centroids[s])) for s in state_polygons],
+        "borders": len(borders),
+        "border_edges": _digest(borders),
+    }
+
+
+@pytest.mark.parametrize("year", sorted(EXPECTED))
+def test_hex_topology_matches_shapely(year):
+    topology = load_hex_topology(DATA_DIR / f"tiles{year}.topo.json")
+    got = summarise(
+        topology.state_polygons(),
+        topology.state_centroids(),
+        topology.border_lines(),
+    )
+    assert got == EXPECTED[year]
+
+
+def test_hex_topology_arrays_are_consistent():
+    topology = load_hex_topology(DATA_DIR / "tiles2020.topo.json")
+    assert topology.ring_offsets[-1] == len(topology.ring_vertices)
+    assert topology.state_offsets[-1] == len(topology.ring_offsets) - 1
+    # Closed rings and edges from the lower to the higher vertex
+    starts = topology.ring_vertices[topology.ring_offsets[:-1]]
+    ends = topology.ring_vertices[topology.ring_offsets[1:] - 1]
+    np.testing.assert_array_equal(starts, ends)
+    assert (topology.border_edges[:, 0] < topology.border_edges[:, 1]).all()
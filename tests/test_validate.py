@@ -0,0 +1,134 @@
+import pytest
+
+from proportional_ec.data import load_candidate_totals_and_parties, load_votes
+from proportional_ec.validate import DataValidationError, validate_votes_file
+
+HEADER = (
+    '"year","state","state_po","state_fips","state_cen","state_ic","office",'
+    '"candidate","party_detailed","writein","candidatevotes","totalvotes",'
+    '"version","notes","party_simplified"\n'
+)
+
+
+def row(year, candidate, party, votes, total=100):
+    return (
+        f'{year},"ALABAMA","AL",1,63,41,"US PRESIDENT","{candidate}","{party}",'
+        f'FALSE,{votes},{total},20210113,NA,"{party}"\n'
+    )
+
+
+ROWS = [
+    row(2020, "BIDEN, JOSEPH R. JR", "DEMOCRAT", 40),
+    row(2020, "TRUMP, DONALD J.", "REPUBLICAN", 60),
+    row(2024, "HARRIS, KAMALA D.", "DEMOCRAT", 35),
+    row(2024, "TRUMP, DONALD J.", "REPUBLICAN", 65),
+]
+YEAR_EC_VOTES = {2020: {"AL": 9}}
+
+
+@pytest.fixture
+def votes_file(tmp_path):
+    path = tmp_path / "votes.csv"
+    path.write_text(HEADER + "".join(ROWS))
+    return path
+
+
+def test_missing_electoral_votes_strict(votes_file):
+    with pytest.raises(DataValidationError) as error:
+        load_candidate_totals_and_parties(votes_file, year_ec_votes=YEAR_EC_VOTES)
+    assert error.value.report.counts() == {"missing_electoral_votes": 1}
+
+
+def test_missing_electoral_votes_lenient_skips_rows(votes_file):
+    with pytest.warns(UserWarning, match="missing_electoral_votes"):
+        votes, parties = load_candidate_totals_and_parties(
+            votes_file,
+            mode="lenient",
+            year_ec_votes=YEAR_EC_VOTES,
+        )
+    assert list(votes) == [2020]
+    assert sum(votes[2020]["AL"].values()) == 100
+    assert list(parties) == [2020]
+
+    report = validate_votes_file(votes_file, YEAR_EC_VOTES)
+    assert report.unusable.tolist() == [False, False, True, True]
+
+
+def test_header_only_file(tmp_path):
+    path = tmp_path / "votes.csv"
+    path.write_text(HEADER)
+    assert validate_votes_file(path, YEAR_EC_VOTES).ok
+    assert load_candidate_totals_and_parties(path) == ({}, {})
+
+
+# One of each problem, keyed by line number
+PROBLEM_ROWS = {
+    2: row(2020, "BIDEN, JOSEPH R. JR", "DEMOCRAT", 40),
+    3: row(2020, "TRUMP, DONALD J.", "REPUBLICAN", 60),
+    4: row(2020, "BIDEN, JOSEPH R. JR", "WORKING FAMILIES", 0),
+    5: row(2016, "CLINTON, HILLARY", "DEMOCRAT", 30),
+    6: row(2016, "TRUMP, DONALD J.", "REPUBLICAN", 60),
+    7: row(2012, "OBAMA, BARACK H.", "DEMOCRAT", 50),
+    8: row(2012, "ROMNEY, MITT", "REPUBLICAN", 50, total=90),
+    9: row(2012, "JOHNSON, GARY", "LIBERTARIAN", 0).replace('"AL"', '"XX"'),
+    10: row(2012, "", "", 0),
+    11: row(2012, "STEIN, JILL", "GREEN", "NA"),
+    12: '2012,"ALABAMA","AL"\n',
+    13: row(2012, "GOODE, VIRGIL", "CONSTITUTION", 0).replace("\n", ",1\n"),
+}
+PROBLEM_EC_VOTES = {2012: {"AL": 9}, 2016: {"AL": 9}, 2020: {"AL": 9}}
+
+
+@pytest.fixture
+def problems_file(tmp_path):
+    path = tmp_path / "votes.csv"
+    path.write_text(HEADER + "".join(PROBLEM_ROWS.values()))
+    return path
+
+
+def test_every_violation_is_collected(problems_file):
+    report = validate_votes_file(problems_file, PROBLEM_EC_VOTES)
+    assert report.counts() == {
+        "column_count": 2,
+        "invalid_number": 1,
+        "missing_candidate": 1,
+        "unknown_state": 1,
+        "inconsistent_total": 1,
+        "total_mismatch": 1,
+        "duplicate_candidate": 2,
+    }
+    assert sorted((v.check, v.line) for v in report.violations) == [
+        ("column_count", 12),
+        ("column_count", 13),
+        ("duplicate_candidate", 2),
+        ("duplicate_candidate", 4),
+        ("inconsistent_total", 8),
+        ("invalid_number", 11),
+        ("missing_candidate", 10),
+        ("total_mismatch", 5),
+        ("unknown_state", 9),
+    ]
+    assert {v.line for v in report.warnings} == {2, 4}
+    assert report.unusable.tolist() == [line >= 9 for line in PROBLEM_ROWS]
+
+    with pytest.raises(DataValidationError, match="column_count"):
+        load_votes(problems_file, year_ec_votes=PROBLEM_EC_VOTES)
+
+
+def test_lenient_mode_drops_unusable_rows(problems_file):
+    with pytest.warns(UserWarning, match="column_count"):
+        votes, _ = load_votes(
+            problems_file,
+            mode="lenient",
+            year_ec_votes=PROBLEM_EC_VOTES,
+        )
+    assert {year: len(votes[year]["AL"]) for year in votes} == {
+        2020: 2,
+        2016: 2,
+        2012: 2,
+    }
+    assert {year: sum(votes[year]["AL"].values()) for year in votes} == {
+        2020: 100,
+        2016: 90,
+        2012: 100,
+    }
@@ -0,0 +1,75 @@
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from proportional_ec.data import load_electoral_college_per_year, load_votes
+from proportional_ec.draw import load_hex_topology
+from proportional_ec.election import run_election
+from proportional_ec.election_method import run_droop_quota_largest_remainder
+from proportional_ec.web_map import export_web_map, web_map_payload
+
+DATA_DIR = Path(__file__).parents[1] / "data"
+YEAR = 2020
+
+
+@pytest.fixture(scope="module")
+def election():
+    year_ec_votes = load_electoral_college_per_year(
+        DATA_DIR / "electoral_college" / "electoral_college.csv",
+    )
+    year_state_votes, index = load_votes(
+        DATA_DIR / "state_votes" / "1976-2020-president.csv",
+    )
+    state_seats = run_election(
+        run_droop_quota_largest_remainder,
+        year_state_votes[YEAR],
+        year_ec_votes[YEAR],
+    )
+    topology = load_hex_topology(DATA_DIR / "topo_data" / f"tiles{YEAR}.topo.json")
+    return topology, state_seats, index.labels(YEAR)
+
+
+def test_web_map_payload(election):
+    topology, state_seats, labels = election
+    payload = web_map_payload({YEAR: topology}, {YEAR: state_seats}, {YEAR: labels})
+    assert payload["years"] == [YEAR]
+    data = payload["data"][str(YEAR)]
+
+    assert len(data["states"]) == 51
+    assert len(data["centroids"]) == 2 * 51
+    assert len(data["borders"]) == 2 * 511
+    assert len(data["hexagons"]) == data["stateOffsets"][-1] == 538
+
+    candidates = data["candidates"]
+    assert sum(seats for _, _, seats in candidates) == 538
+    assert all(0 <= i < len(candidates) for i in data["hexagons"])
+
+    offsets = data["stateOffsets"]
+    for i, (state, break_down) in enumerate(
+        zip(data["states"], data["breakDown"], strict=True),
+    ):
+        hexagons = data["hexagons"][offsets[i] : offsets[i + 1]]
+        assert {candidates[c][0]: seats for c, seats in break_down} == {
+            labels[candidate].name: seats
+            for candidate, seats in state_seats[state].items()
+            if seats
+        }
+        assert sorted(hexagons) == sorted(
+            c for c, seats in break_down for _ in range(seats)
+        )
+
+
+def test_candidate_names_are_escaped(election, tmp_path):
+    topology, state_seats, labels = election
+    candidate = next(iter(state_seats["AL"]))
+    labels = {
+        **labels,
+        candidate: replace(labels[candidate], name="</script><b>Injected</b>"),
+    }
+    out_path = tmp_path / "map.html"
+    export_web_map(out_path, {YEAR: topology}, {YEAR: state_seats}, {YEAR: labels})
+
+    html = out_path.read_text()
+    assert "</script><b>" not in html
+    assert r"\u003c/script\u003e\u003cb\u003eInjected" in html